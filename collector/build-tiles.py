@@ -25,118 +25,291 @@ Usage:
     --zoom-chokepoint-corridor 6 \
     --zoom-sts-corridor 6 \
     --zoom-gate 6 \
-    [--per-area]
+    [--per-area] [--in-db]
 
 Output:
 - One semicolon-separated line: "z/x/y;z/x/y;..."
 - Optional per-area breakdown with --per-area.
+- --in-db computes the same coverage inside PostGIS (generate_series) and only
+  streams the distinct MT (z,x,y) rows back.
 """
 
 import os
-import math
 import argparse
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
 import psycopg
-from psycopg.rows import dict_row
-from typing import List, Tuple, Set, Dict
+from typing import Dict, Iterator, List, Tuple
 
 MERCATOR_LAT_MAX = 85.05112878   # Web-Mercator clamp
 MT_XY_FACTOR     = 2             # MT tile spans 2×2 OSM tiles at same z (your observed mapping)
+TILE_XY_BITS     = 29            # packed tile id layout: z<<58 | x<<29 | y
+TILE_XY_MASK     = (1 << TILE_XY_BITS) - 1
+BBOX_CHUNK       = 1000          # bboxes per worker task
 
 # ---------- OSM helpers ----------
-def lonlat_to_osm_tile(lon: float, lat: float, z: int) -> Tuple[int, int]:
-    """OSM XYZ: convert lon/lat to tile x,y at zoom z."""
-    lat = max(-MERCATOR_LAT_MAX, min(MERCATOR_LAT_MAX, float(lat)))
+def lonlat_to_osm_tile_vec(lon: np.ndarray, lat: np.ndarray, z: int) -> Tuple[np.ndarray, np.ndarray]:
+    """OSM XYZ: arrays of lon/lat -> arrays of tile x,y at zoom z."""
+    lat = np.clip(np.asarray(lat, dtype=np.float64), -MERCATOR_LAT_MAX, MERCATOR_LAT_MAX)
+    lon = np.asarray(lon, dtype=np.float64)
     n = 2 ** z
-    x = int((float(lon) + 180.0) / 360.0 * n)
-    y = int((1.0 - math.log(math.tan(math.radians(lat)) + 1.0 / math.cos(math.radians(lat))) / math.pi) / 2.0 * n)
+    rlat = np.radians(lat)
+    x = ((lon + 180.0) / 360.0 * n).astype(np.int64)
+    y = ((1.0 - np.arcsinh(np.tan(rlat)) / np.pi) / 2.0 * n).astype(np.int64)
     return x, y
 
-def osm_tiles_for_bbox(minlon: float, minlat: float, maxlon: float, maxlat: float, z: int) -> List[Tuple[int,int,int]]:
+def osm_tile_ranges(minlon, minlat, maxlon, maxlat, z: int):
     """
-    Return list of OSM (z,x,y) tiles covering bbox at zoom z.
-    Handles antimeridian-crossing bboxes by splitting at 180/-180.
+    Per-bbox OSM tile index ranges at zoom z: (x_lo, x_hi, y_lo, y_hi, owner) arrays.
+    Inputs may be scalars or equal-length arrays (one entry per bbox).
+    Antimeridian-crossing bboxes are split at 180/-180 into two ranges; 'owner'
+    maps each range back to the index of the bbox it came from.
     """
-    tiles: List[Tuple[int,int,int]] = []
-
-    def cover_segment(lo_lon: float, hi_lon: float):
-        x0, y1 = lonlat_to_osm_tile(lo_lon, minlat, z)  # SW
-        x1, y0 = lonlat_to_osm_tile(hi_lon, maxlat, z)  # NE
-        xs = range(min(x0, x1), max(x0, x1) + 1)
-        ys = range(min(y0, y1), max(y0, y1) + 1)
-        for x in xs:
-            for y in ys:
-                tiles.append((z, x, y))
-
-    # Normalize longitudes to [-180, 180]
-    minlon = ((minlon + 180.0) % 360.0) - 180.0
-    maxlon = ((maxlon + 180.0) % 360.0) - 180.0
-
-    if maxlon >= minlon:
-        cover_segment(minlon, maxlon)
+    minlon = np.array(minlon, dtype=np.float64, ndmin=1)  # copies: normalised in place below
+    minlat = np.atleast_1d(np.asarray(minlat, dtype=np.float64))
+    maxlon = np.array(maxlon, dtype=np.float64, ndmin=1)
+    maxlat = np.atleast_1d(np.asarray(maxlat, dtype=np.float64))
+    owner  = np.arange(len(minlon))
+
+    # Normalize longitudes to [-180, 180); only out-of-range entries pay for the mod
+    for lon in (minlon, maxlon):
+        out = (lon < -180.0) | (lon >= 180.0)
+        if out.any():
+            lon[out] = ((lon[out] + 180.0) % 360.0) - 180.0
+
+    # Crosses antimeridian: split into [minlon,180] ∪ [-180,maxlon]
+    cross = maxlon < minlon
+    if cross.any():
+        lo_lon = np.concatenate([minlon, np.full(int(cross.sum()), -180.0)])
+        hi_lon = np.concatenate([np.where(cross, 180.0 - 1e-9, maxlon), maxlon[cross]])
+        lo_lat = np.concatenate([minlat, minlat[cross]])
+        hi_lat = np.concatenate([maxlat, maxlat[cross]])
+        owner  = np.concatenate([owner, owner[cross]])
     else:
-        # Crosses antimeridian: split into [minlon,180] ∪ [-180,maxlon]
-        cover_segment(minlon, 180.0 - 1e-9)
-        cover_segment(-180.0, maxlon)
+        lo_lon, hi_lon, lo_lat, hi_lat = minlon, maxlon, minlat, maxlat
+
+    x0, y1 = lonlat_to_osm_tile_vec(lo_lon, lo_lat, z)  # SW
+    x1, y0 = lonlat_to_osm_tile_vec(hi_lon, hi_lat, z)  # NE
+    return np.minimum(x0, x1), np.maximum(x0, x1), np.minimum(y0, y1), np.maximum(y0, y1), owner
+
+def _expand_tile_ranges(xa, xb, ya, yb, z: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Expand each [xa..xb] × [ya..yb] range into (z,x,y) rows without a Python loop; also return the range index per row."""
+    ny = yb - ya + 1
+    counts = (xb - xa + 1) * ny
+    seg = np.repeat(np.arange(len(counts)), counts)
+    off = np.arange(int(counts.sum())) - np.repeat(np.cumsum(counts) - counts, counts)
 
+    # Fill the preallocated (N,3) buffer in place: one divmod gives both x and y offsets
+    tiles = np.empty((len(seg), 3), dtype=np.int64)
+    tiles[:, 0] = z
+    np.divmod(off, ny[seg], out=(tiles[:, 1], tiles[:, 2]))
+    tiles[:, 1] += xa[seg]
+    tiles[:, 2] += ya[seg]
+    return tiles, seg
+
+def osm_tiles_for_bbox(minlon, minlat, maxlon, maxlat, z: int, return_index: bool = False):
+    """
+    Return an (N,3) int64 array of OSM (z,x,y) tiles covering one or many bboxes at zoom z.
+    With return_index=True also return, per tile, the index of the bbox it came from.
+    """
+    xa, xb, ya, yb, owner = osm_tile_ranges(minlon, minlat, maxlon, maxlat, z)
+    tiles, seg = _expand_tile_ranges(xa, xb, ya, yb, z)
+    if return_index:
+        return tiles, owner[seg]
     return tiles
 
+# ---------- Packed tile ids ----------
+def pack_tile_ids(z, x, y) -> np.ndarray:
+    """Pack (z,x,y) arrays into uint64 ids; sorting the ids sorts by (z,x,y)."""
+    z = np.asarray(z).astype(np.uint64)
+    x = np.asarray(x).astype(np.uint64)
+    y = np.asarray(y).astype(np.uint64)
+    return (z << np.uint64(2 * TILE_XY_BITS)) | (x << np.uint64(TILE_XY_BITS)) | y
+
+def unpack_tile_ids(ids: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Inverse of pack_tile_ids: uint64 ids -> (z, x, y) int64 arrays."""
+    ids = np.asarray(ids, dtype=np.uint64)
+    z = (ids >> np.uint64(2 * TILE_XY_BITS)).astype(np.int64)
+    x = ((ids >> np.uint64(TILE_XY_BITS)) & np.uint64(TILE_XY_MASK)).astype(np.int64)
+    y = (ids & np.uint64(TILE_XY_MASK)).astype(np.int64)
+    return z, x, y
+
+def format_tile_ids(ids: np.ndarray) -> str:
+    """Render packed ids as "z/x/y;z/x/y;..." in the order given."""
+    z, x, y = unpack_tile_ids(ids)
+    # One %-format over a flat (z,x,y,z,x,y,...) tuple instead of an f-string per tile
+    return ";".join(["%d/%d/%d"] * len(z)) % tuple(np.column_stack([z, x, y]).ravel().tolist())
+
 # ---------- OSM → MarineTraffic compression ----------
-def compress_osm_to_mt(osm_tiles: List[Tuple[int,int,int]], factor: int = MT_XY_FACTOR) -> Set[Tuple[int,int,int]]:
+def mt_tiles_for_bbox(minlon, minlat, maxlon, maxlat, z: int, factor: int = MT_XY_FACTOR, return_index: bool = False):
     """
-    Map OSM tiles to MT tiles by floor-dividing x,y by 'factor' (default 2).
-    Deduplicates automatically via a set.
+    Return an (N,3) int64 array of MT (z,x,y) tiles covering one or many bboxes.
+    For a power-of-two factor 2**k the MT grid at z *is* the OSM grid at z-k
+    (floor(osm_x(z) / 2**k) == osm_x(z-k): scaling by 2**k is exact in floating
+    point), so corners are computed at z-k directly. Other factors floor-divide
+    the OSM corner indices. Either way only MT tiles are enumerated.
+    Antimeridian halves may share an MT tile; callers np.unique the packed ids.
     """
-    out: Set[Tuple[int,int,int]] = set()
-    for z, x, y in osm_tiles:
-        out.add((z, x // factor, y // factor))
-    return out
+    shift = factor.bit_length() - 1
+    if factor == 1 << shift and z >= shift:
+        xa, xb, ya, yb, owner = osm_tile_ranges(minlon, minlat, maxlon, maxlat, z - shift)
+    else:
+        xa, xb, ya, yb, owner = osm_tile_ranges(minlon, minlat, maxlon, maxlat, z)
+        xa, xb, ya, yb = xa // factor, xb // factor, ya // factor, yb // factor
+    tiles, seg = _expand_tile_ranges(xa, xb, ya, yb, z)
+    if return_index:
+        return tiles, owner[seg]
+    return tiles
+
+def mt_ids_for_group(z: int, group: List[Tuple[str, float, float, float, float]], factor: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Packed MT ids (not deduplicated) for a batch of (label, minlon, minlat, maxlon, maxlat) at zoom z, plus owner index per id."""
+    bb = np.array([g[1:] for g in group], dtype=np.float64)
+    mt, owner = mt_tiles_for_bbox(bb[:, 0], bb[:, 1], bb[:, 2], bb[:, 3], z, factor=factor, return_index=True)
+    return pack_tile_ids(mt[:, 0], mt[:, 1], mt[:, 2]), owner
 
 # ---------- Zoom selection ----------
-def pick_zoom(kind: str, subtype: str, is_gate: bool, args) -> int:
-    """Choose a 'MarineTraffic zoom' per class (same z used for OSM coverage before compressing)."""
-    if is_gate:
-        return args.zoom_gate
-    if kind == "port" and subtype == "core":
-        return args.zoom_port_core
-    if kind == "port" and subtype == "approach":
-        return args.zoom_port_approach
-    if subtype == "corridor":
-        if kind == "lane":
-            return args.zoom_lane_corridor
-        if kind == "chokepoint":
-            return args.zoom_chokepoint_corridor
-        if kind == "sts":
-            return args.zoom_sts_corridor
-    return args.zoom_lane_corridor
+def build_zoom_table(args) -> Dict[Tuple[str, str, bool], int]:
+    """
+    Map (kind, subtype, is_gate) -> 'MarineTraffic zoom' per class, built once from args
+    (same z used for OSM coverage before compressing). Gates always use --zoom-gate;
+    anything not listed falls back to --zoom-lane-corridor.
+    """
+    return {
+        ("port", "core", False):           args.zoom_port_core,
+        ("port", "approach", False):       args.zoom_port_approach,
+        ("lane", "corridor", False):       args.zoom_lane_corridor,
+        ("chokepoint", "corridor", False): args.zoom_chokepoint_corridor,
+        ("sts", "corridor", False):        args.zoom_sts_corridor,
+        ("lane", "gate", True):            args.zoom_gate,
+        ("chokepoint", "gate", True):      args.zoom_gate,
+    }
 
 # ---------- DB fetch ----------
-def fetch_area_bboxes(conn, buffer_deg: float) -> List[dict]:
+# Named (server-side) cursors stream rows in itersize batches instead of
+# materialising the whole result client-side. No trailing ';' (DECLARE ... FOR).
+# Bboxes come precomputed from mv_area_bbox / mv_area_gate_bbox (db/init.sql);
+# expanding a bbox by d degrees is just ±d, same as ST_Envelope(ST_Expand(geom, d)).
+FETCH_ITERSIZE = 10_000
+
+def fetch_bboxes(conn, area_buffer_deg: float, gate_buffer_deg: float) -> Iterator[tuple]:
+    """
+    Areas and gates in one round-trip, as plain tuples:
+      (src, area_id, gate_id, kind, subtype, minlon, minlat, maxlon, maxlat)
+    'src' tags each row ('area' | 'gate'); gate rows carry subtype 'gate'
+    (their side is irrelevant for zoom selection).
+    """
     sql = """
-    SELECT area_id, kind, subtype,
-           ST_XMin(env) AS minlon, ST_YMin(env) AS minlat,
-           ST_XMax(env) AS maxlon, ST_YMax(env) AS maxlat
-    FROM (
-      SELECT area_id, kind, subtype, ST_Envelope(ST_Expand(geom, %s)) AS env
-      FROM public.area
-    ) q;
+    SELECT 'area' AS src, area_id, NULL::text AS gate_id, kind, subtype,
+           minlon - %(area_buf)s AS minlon, minlat - %(area_buf)s AS minlat,
+           maxlon + %(area_buf)s AS maxlon, maxlat + %(area_buf)s AS maxlat
+    FROM public.mv_area_bbox
+    UNION ALL
+    SELECT 'gate', area_id, gate_id, kind, 'gate',
+           minlon - %(gate_buf)s, minlat - %(gate_buf)s,
+           maxlon + %(gate_buf)s, maxlat + %(gate_buf)s
+    FROM public.mv_area_gate_bbox
     """
-    with conn.cursor(row_factory=dict_row) as cur:
-        cur.execute(sql, (buffer_deg,))
-        return cur.fetchall()
+    with conn.cursor(name="bboxes") as cur:
+        cur.itersize = FETCH_ITERSIZE
+        cur.execute(sql, {"area_buf": area_buffer_deg, "gate_buf": gate_buffer_deg})
+        yield from cur
 
-def fetch_gate_bboxes(conn, buffer_deg: float) -> List[dict]:
-    sql = """
-    SELECT gate_id, area_id, kind, subtype,
-           ST_XMin(env) AS minlon, ST_YMin(env) AS minlat,
-           ST_XMax(env) AS maxlon, ST_YMax(env) AS maxlat
-    FROM (
-      SELECT gate_id, area_id, kind, subtype, ST_Envelope(ST_Expand(geom, %s)) AS env
-      FROM public.area_gate
-    ) q;
+# ---------- DB-side tile computation (--in-db) ----------
+# Same coverage as the NumPy path, computed entirely in PostGIS: zoom via CASE
+# (mirrors build_zoom_table), antimeridian split, Mercator corners, MT ranges
+# via generate_series, DISTINCT.
+MT_TILES_SQL = """
+WITH boxes AS (
+  SELECT area_id AS label,
+         CASE
+           WHEN kind = 'port' AND subtype = 'core'         THEN %(zoom_port_core)s
+           WHEN kind = 'port' AND subtype = 'approach'     THEN %(zoom_port_approach)s
+           WHEN kind = 'chokepoint' AND subtype = 'corridor' THEN %(zoom_chokepoint_corridor)s
+           WHEN kind = 'sts' AND subtype = 'corridor'      THEN %(zoom_sts_corridor)s
+           ELSE %(zoom_lane_corridor)s
+         END AS z,
+         minlon - %(area_buffer_deg)s AS x0, minlat - %(area_buffer_deg)s AS y0,
+         maxlon + %(area_buffer_deg)s AS x1, maxlat + %(area_buffer_deg)s AS y1
+  FROM public.mv_area_bbox
+  UNION ALL
+  SELECT area_id || '::' || gate_id, %(zoom_gate)s,
+         minlon - %(gate_buffer_deg)s, minlat - %(gate_buffer_deg)s,
+         maxlon + %(gate_buffer_deg)s, maxlat + %(gate_buffer_deg)s
+  FROM public.mv_area_gate_bbox
+),
+norm AS (
+  -- Normalize longitudes to [-180, 180)
+  SELECT label, z::int AS z,
+         x0 + 180.0 - 360.0 * floor((x0 + 180.0) / 360.0) - 180.0 AS minlon,
+         x1 + 180.0 - 360.0 * floor((x1 + 180.0) / 360.0) - 180.0 AS maxlon,
+         GREATEST(-%(lat_max)s, LEAST(%(lat_max)s, y0)) AS minlat,
+         GREATEST(-%(lat_max)s, LEAST(%(lat_max)s, y1)) AS maxlat
+  FROM boxes
+),
+segs AS (
+  -- Crosses antimeridian: split into [minlon,180] ∪ [-180,maxlon]
+  SELECT label, z, minlon AS lo, CASE WHEN maxlon < minlon THEN 180.0 - 1e-9 ELSE maxlon END AS hi, minlat, maxlat
+  FROM norm
+  UNION ALL
+  SELECT label, z, -180.0, maxlon, minlat, maxlat
+  FROM norm
+  WHERE maxlon < minlon
+),
+corners AS (
+  SELECT label, z,
+         trunc((lo + 180.0) / 360.0 * power(2, z))::int AS x0,
+         trunc((hi + 180.0) / 360.0 * power(2, z))::int AS x1,
+         trunc((1.0 - asinh(tan(radians(maxlat))) / pi()) / 2.0 * power(2, z))::int AS y0,
+         trunc((1.0 - asinh(tan(radians(minlat))) / pi()) / 2.0 * power(2, z))::int AS y1
+  FROM segs
+)
+SELECT DISTINCT (c.z::bigint << %(z_shift)s) | (mx::bigint << %(xy_bits)s) | my::bigint AS id,
+       CASE WHEN %(per_area)s THEN c.label END AS label
+FROM corners c
+CROSS JOIN LATERAL generate_series(LEAST(c.x0, c.x1) / %(factor)s, GREATEST(c.x0, c.x1) / %(factor)s) AS mx
+CROSS JOIN LATERAL generate_series(LEAST(c.y0, c.y1) / %(factor)s, GREATEST(c.y0, c.y1) / %(factor)s) AS my
+"""
+
+def fetch_mt_tiles_in_db(conn, args, factor: int) -> Tuple[List[np.ndarray], Dict[str, List[np.ndarray]]]:
+    """
+    Run MT_TILES_SQL and stream (id, label) rows via COPY into packed id arrays.
+    Ids are packed server-side with the pack_tile_ids layout (fits a signed
+    int8 for z < 32), so each row is one Python int instead of three.
     """
-    with conn.cursor(row_factory=dict_row) as cur:
-        cur.execute(sql, (buffer_deg,))
-        return cur.fetchall()
+    params = {
+        "zoom_port_core": args.zoom_port_core,
+        "zoom_port_approach": args.zoom_port_approach,
+        "zoom_lane_corridor": args.zoom_lane_corridor,
+        "zoom_chokepoint_corridor": args.zoom_chokepoint_corridor,
+        "zoom_sts_corridor": args.zoom_sts_corridor,
+        "zoom_gate": args.zoom_gate,
+        "area_buffer_deg": args.area_buffer_deg,
+        "gate_buffer_deg": args.gate_buffer_deg,
+        "lat_max": MERCATOR_LAT_MAX,
+        "factor": factor,
+        "per_area": bool(args.per_area),
+        "z_shift": 2 * TILE_XY_BITS,
+        "xy_bits": TILE_XY_BITS,
+    }
+    packed: List[int] = []
+    labels: List[str] = []
+    with conn.cursor() as cur:
+        with cur.copy(f"COPY ({MT_TILES_SQL}) TO STDOUT", params) as copy:
+            copy.set_types(["int8", "text"])
+            for tile_id, label in copy.rows():
+                packed.append(tile_id); labels.append(label)
+
+    ids = np.array(packed, dtype=np.int64).astype(np.uint64)
+    per_area: Dict[str, List[np.ndarray]] = {}
+    if args.per_area and labels:
+        # Group on integer label codes: one argsort, then a slice per label
+        keys, codes = np.unique(np.array(labels, dtype=object), return_inverse=True)
+        ids_by_code = ids[np.argsort(codes, kind="stable")]
+        ends = np.cumsum(np.bincount(codes, minlength=len(keys)))
+        for k, start, end in zip(keys.tolist(), np.concatenate([[0], ends[:-1]]).tolist(), ends.tolist()):
+            per_area[k] = [ids_by_code[start:end]]
+    return [ids], per_area
 
 # ---------- Main ----------
 def main():
@@ -154,36 +327,54 @@ def main():
     # Mapping factor (OSM→MT); leave at 2 for your case
     ap.add_argument("--mt-xy-factor", type=int, default=MT_XY_FACTOR, help="OSM tiles per MT tile edge (default 2)")
     ap.add_argument("--per-area", action="store_true", help="also print per-area groups for debugging")
+    ap.add_argument("--in-db", action="store_true", help="compute tiles inside PostGIS (generate_series) instead of NumPy")
+    ap.add_argument("--workers", type=int, default=min(8, os.cpu_count() or 1), help="threads for the NumPy tile computation")
     args = ap.parse_args()
 
     factor = max(1, int(args.mt_xy_factor))
 
-    mt_tiles: Set[Tuple[int,int,int]] = set()
-    per_area: Dict[str, Set[Tuple[int,int,int]]] = {}
+    all_ids: List[np.ndarray] = []
+    per_area: Dict[str, List[np.ndarray]] = {}
+
+    # Batch bboxes by zoom so each zoom level is one vectorised call; rows are
+    # consumed as they stream in and only (label, bbox) is kept per row.
+    by_zoom: Dict[int, List[Tuple[str, float, float, float, float]]] = defaultdict(list)
 
     with psycopg.connect(args.pg_dsn) as conn:
-        # Areas
-        for r in fetch_area_bboxes(conn, args.area_buffer_deg):
-            z = pick_zoom(r["kind"], r["subtype"], False, args)
-            osm = osm_tiles_for_bbox(r["minlon"], r["minlat"], r["maxlon"], r["maxlat"], z)
-            mt  = compress_osm_to_mt(osm, factor=factor)
-            mt_tiles |= mt
-            if args.per_area:
-                per_area.setdefault(r["area_id"], set()).update(mt)
-
-        # Gates
-        for r in fetch_gate_bboxes(conn, args.gate_buffer_deg):
-            z = pick_zoom(r["kind"], "gate", True, args)
-            osm = osm_tiles_for_bbox(r["minlon"], r["minlat"], r["maxlon"], r["maxlat"], z)
-            mt  = compress_osm_to_mt(osm, factor=factor)
-            mt_tiles |= mt
+        if args.in_db:
+            all_ids, per_area = fetch_mt_tiles_in_db(conn, args, factor)
+        else:
+            zooms = build_zoom_table(args)
+            for src, area_id, gate_id, kind, subtype, minlon, minlat, maxlon, maxlat in fetch_bboxes(
+                conn, args.area_buffer_deg, args.gate_buffer_deg
+            ):
+                if src == "gate":
+                    z = zooms.get((kind, "gate", True), args.zoom_gate)
+                    label = f"{area_id}::{gate_id}"
+                else:
+                    z = zooms.get((kind, subtype, False), args.zoom_lane_corridor)
+                    label = area_id
+                by_zoom[z].append((label, minlon, minlat, maxlon, maxlat))
+
+    # Chunks are independent; NumPy releases the GIL so a thread pool scales
+    # without pickling id arrays between processes.
+    tasks = [(z, group[i:i + BBOX_CHUNK]) for z, group in by_zoom.items() for i in range(0, len(group), BBOX_CHUNK)]
+    with ThreadPoolExecutor(max_workers=max(1, args.workers)) as ex:
+        results = ex.map(lambda t: mt_ids_for_group(t[0], t[1], factor), tasks)
+        for (z, group), (ids, owner) in zip(tasks, results):
+            all_ids.append(ids)
             if args.per_area:
-                label = f"{r['area_id']}::{r['gate_id']}"
-                per_area.setdefault(label, set()).update(mt)
+                # One stable reorder by owner, then contiguous slices per bbox
+                # (instead of a full-length boolean mask for every bbox)
+                ids_by_owner = ids[np.argsort(owner, kind="stable")]
+                counts = np.bincount(owner, minlength=len(group))
+                ends = np.cumsum(counts)
+                for (label, *_), start, end in zip(group, (ends - counts).tolist(), ends.tolist()):
+                    per_area.setdefault(label, []).append(ids_by_owner[start:end])
 
-    # Stable sort and print
-    out = sorted(mt_tiles, key=lambda t: (t[0], t[1], t[2]))
-    s = ";".join(f"{z}/{x}/{y}" for (z,x,y) in out)
+    # Dedup + stable (z,x,y) sort in one pass on the packed ids
+    out = np.unique(np.concatenate(all_ids)) if all_ids else np.empty(0, dtype=np.uint64)
+    s = format_tile_ids(out)
 
     print("# Paste this into STATIC_TILES (MarineTraffic z/X/Y; semicolon-separated):")
     print(s)
@@ -192,8 +383,8 @@ def main():
     if args.per_area:
         print("\n# ---- Per-area MT tile breakdown ----")
         for k in sorted(per_area.keys()):
-            lst = sorted(per_area[k], key=lambda t: (t[0], t[1], t[2]))
-            joined = ";".join(f"{z}/{x}/{y}" for (z,x,y) in lst)
+            lst = np.unique(np.concatenate(per_area[k]))
+            joined = format_tile_ids(lst)
             print(f"# {k} ({len(lst)} MT tiles):")
             print(joined)
             print()
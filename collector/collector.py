@@ -10,6 +10,7 @@ Unified AIS Collector (tiles → normalized tanker fixes → Timescale/PostGIS)
     - Computes a robust **vessel_uid**:
         MMSI/IMO/MTID > else hashed surrogate from (name, flag, len, width, type).
     - Optional **spatial prefilter** against buffered AREA/GATE bounding boxes.
+    - Tiles are fetched over a pooled httpx client; Chrome only bootstraps cookies.
 
 """
 
@@ -25,15 +26,20 @@ import hashlib
 import random
 import logging
 import tempfile
+import threading
 import subprocess
-from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
+from functools import lru_cache
 from pathlib import Path
 from typing import Any, Dict, List, Optional, Tuple, Iterable
 from itertools import cycle, islice
+from operator import itemgetter
 from datetime import datetime, timedelta, timezone
 from logging.handlers import TimedRotatingFileHandler
 
+import numpy as np
+
 # --------------------------- Runtime / 3-line UI ----------------------------
 try:
     import colorama
@@ -85,6 +91,9 @@ _bottom_line = "(countdown)"
 _live_obj    = None
 _UI_ENABLED  = True
 _printed_block = False  # have we printed the initial 3-line block?
+# fetch_tiles' workers report backoff through ui_set_bottom: one writer at a time,
+# or the cursor-up/rewrite sequences of two redraws interleave
+_UI_LOCK = threading.RLock()
 
 
 def _view_text() -> str:
@@ -96,8 +105,16 @@ def _renderable():
         return Text(_view_text())
     return _view_text()
 
+def _ui_active() -> bool:
+    # Non-TTY output (pipes, service logs) only gets redraws if single-line mode was asked for
+    return _UI_ENABLED and (IS_TTY or UI_MODE == "single")
+
 def _refresh():
-    if not _UI_ENABLED:
+    with _UI_LOCK:
+        _redraw()
+
+def _redraw():
+    if not _ui_active():
         return
 
     # Fixed 3-line, in-place updater
@@ -122,33 +139,38 @@ def _refresh():
     if USE_RICH and _live_obj is not None:
         _live_obj.update(_renderable())
     else:
-        os.system("cls" if os.name == "nt" else "clear")
+        # home + clear screen via ANSI (colorama covers Windows) instead of forking a shell
+        sys.stdout.write("\x1b[H\x1b[2J")
         sys.stdout.write(_view_text() + "\n")
         sys.stdout.flush()
 
 def ui_disable():
     global _UI_ENABLED
-    if _UI_ENABLED and _use_three_ansi():
-        # move cursor to next clean line when exiting
-        sys.stdout.write("\n")
-        sys.stdout.flush()
-    _UI_ENABLED = False
+    with _UI_LOCK:
+        if _UI_ENABLED and _use_three_ansi():
+            # move cursor to next clean line when exiting
+            sys.stdout.write("\n")
+            sys.stdout.flush()
+        _UI_ENABLED = False
 
 
 def ui_set_setup(text: str):
     global _setup_line
-    _setup_line = text
-    _refresh()
+    with _UI_LOCK:
+        _setup_line = text
+        _refresh()
 
 def ui_set_latest(text: str):
     global _latest_line
-    _latest_line = text
-    _refresh()
+    with _UI_LOCK:
+        _latest_line = text
+        _refresh()
 
 def ui_set_bottom(text: str):
     global _bottom_line
-    _bottom_line = text
-    _refresh()
+    with _UI_LOCK:
+        _bottom_line = text
+        _refresh()
 
 # ------------------------------ Configuration -------------------------------
 
@@ -172,6 +194,9 @@ MAX_RETRIES         = 0
 BACKOFF_BASE_SECS   = 5.0
 TILE_PAUSE_MS       = 2500
 TILE_JITTER_MS      = 600
+FETCH_WORKERS       = 4                                                    # concurrent tile fetches
+
+REFRESH_EVERY_CYCLES = 4                                                   # CAGG/MV refresh cadence (~10 min)
 
 COOLDOWN_FAIL_RATIO = 0.4
 COOLDOWN_SECONDS    = 120
@@ -204,9 +229,10 @@ def setup_logging() -> logging.Logger:
 
 logger = setup_logging()
 
+from maintenance import refresh_all
+
 # ------------------------------ Selenium driver -----------------------------
 from selenium import webdriver
-from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.chrome.options import Options
@@ -293,29 +319,103 @@ def safe_quit(driver: Optional[webdriver.Chrome]):
         except Exception:
             pass
 
-def _extract_json_from_dom(driver: webdriver.Chrome) -> Optional[dict]:
+# ------------------------------ HTTP session --------------------------------
+# Tiles are plain JSON, so they are fetched over a keep-alive httpx client. The
+# browser is only used briefly to pick up the site's cookies + User-Agent, then
+# closed, so tile requests look like the page's own XHRs.
+import httpx
+
+try:
+    import orjson                      # optional: SIMD JSON parsing of tile payloads
+    _json_loads = orjson.loads
+except Exception:
+    _json_loads = json.loads
+MT_HOME_URL     = "https://www.marinetraffic.com/"
+HTTP_TIMEOUT_S  = 10
+HTTP_HEADERS    = {
+    "Accept": "application/json, text/plain, */*",
+    "X-Requested-With": "XMLHttpRequest",
+    "Referer": MT_HOME_URL,
+}
+
+def open_http_client() -> httpx.Client:
     """
-    The MarineTraffic tile endpoint renders JSON directly; grab body/pre text and parse.
+    Bootstrap cookies/UA with a short-lived Chrome session and hand them to a
+    pooled httpx.Client. Falls back to a bare client if the browser step fails.
     """
-    pres = driver.find_elements(By.TAG_NAME, "pre")
-    if pres:
-        text = pres[0].text
-    else:
-        text = driver.execute_script("return document.body ? document.body.innerText : '';") or ""
-    text = text.strip()
-    if not text:
+    headers = dict(HTTP_HEADERS)
+    cookies: Dict[str, str] = {}
+    driver = None
+    try:
+        driver = open_driver(minimized=True, size=(400, 300))
+        driver.get(MT_HOME_URL)
+        WebDriverWait(driver, HTTP_TIMEOUT_S).until(
+            lambda d: d.execute_script("return document.readyState") == "complete"
+        )
+        headers["User-Agent"] = driver.execute_script("return navigator.userAgent")
+        cookies = {c["name"]: c["value"] for c in driver.get_cookies()}
+    except Exception as e:
+        logger.warning("http: cookie bootstrap failed, continuing without: %s", e)
+    finally:
+        safe_quit(driver)
+    return httpx.Client(
+        headers=headers, cookies=cookies, timeout=HTTP_TIMEOUT_S, follow_redirects=True,
+        limits=httpx.Limits(max_keepalive_connections=8),
+    )
+
+_HTTP_CLIENT: Optional[httpx.Client] = None
+
+def get_http_client() -> httpx.Client:
+    global _HTTP_CLIENT
+    if _HTTP_CLIENT is None or _HTTP_CLIENT.is_closed:
+        _HTTP_CLIENT = open_http_client()
+    return _HTTP_CLIENT
+
+def close_http_client() -> None:
+    global _HTTP_CLIENT
+    if _HTTP_CLIENT is not None:
+        try: _HTTP_CLIENT.close()
+        except Exception: pass
+    _HTTP_CLIENT = None
+
+# Conditional GETs: remember each tile URL's validators and send them back.
+# A 304 means the tile is unchanged since the last cycle, so normalize + insert
+# can be skipped (the dedupe trigger would drop every row anyway).
+NOT_MODIFIED: Dict[str, Any] = {"data": {"rows": []}, "not_modified": True}
+TILE_VALIDATORS: Dict[str, Tuple[Optional[str], Optional[str]]] = {}   # url -> (ETag, Last-Modified)
+# Fallback when the server ignores validators: a 200 whose body is byte-identical
+# to the previous one for that URL is reported as NOT_MODIFIED too.
+TILE_DIGESTS: Dict[str, bytes] = {}                                     # url -> blake2b(body)
+
+def fetch_once(client: httpx.Client, url: str) -> Optional[dict]:
+    headers = {}
+    etag, last_mod = TILE_VALIDATORS.get(url, (None, None))
+    if etag:
+        headers["If-None-Match"] = etag
+    if last_mod:
+        headers["If-Modified-Since"] = last_mod
+    try:
+        resp = client.get(url, headers=headers)
+    except httpx.HTTPError as e:
+        logger.warning("http: %s failed: %s", url, e)
         return None
+    if resp.status_code == 304:
+        return NOT_MODIFIED
+    if resp.status_code != 200:
+        return None
+    body = resp.content
+    digest = hashlib.blake2b(body, digest_size=16).digest()
+    if TILE_DIGESTS.get(url) == digest:
+        return NOT_MODIFIED
     try:
-        return json.loads(text)
-    except json.JSONDecodeError:
+        payload = _json_loads(body)   # bytes in: no str decode round-trip
+    except ValueError:
         return None
-
-def fetch_once(driver: webdriver.Chrome, url: str, wait_seconds: int = 10) -> Optional[dict]:
-    driver.get(url)
-    WebDriverWait(driver, wait_seconds).until(
-        lambda d: d.execute_script("return document.readyState") == "complete"
-    )
-    return _extract_json_from_dom(driver)
+    TILE_DIGESTS[url] = digest
+    etag, last_mod = resp.headers.get("ETag"), resp.headers.get("Last-Modified")
+    if etag or last_mod:
+        TILE_VALIDATORS[url] = (etag, last_mod)
+    return payload
 
 def tile_url(z: int, x: int, y: int) -> str:
     # Note: this is your previous endpoint; update path params if you add SAT/alt layers
@@ -326,7 +426,10 @@ def parse_tile_str(s: str) -> Tuple[int,int,int]:
     z, x, y = s.strip().split("/")
     return int(z), int(x), int(y)
 
-def build_tile_cycle() -> Tuple[Iterable[Tuple[int,int,int]], int]:
+# (z, x, y, url, tile_id): URL and label are formatted once at startup, not per fetch
+TileSpec = Tuple[int, int, int, str, str]
+
+def build_tile_cycle() -> Tuple[Iterable[TileSpec], int]:
     """
     Currently supports only static tile lists (env: STATIC_TILES).
     See suggestions to build tiles dynamically from AREA/GATE bboxes.
@@ -336,22 +439,30 @@ def build_tile_cycle() -> Tuple[Iterable[Tuple[int,int,int]], int]:
     tiles = [t for t in (p.strip() for p in STATIC_TILES.split(";")) if t]
     if not tiles:
         raise ValueError("STATIC_TILES is empty.")
-    return cycle([parse_tile_str(t) for t in tiles]), len(tiles)
+    specs = [(z, x, y, tile_url(z, x, y), f"{z}, {x}, {y}") for z, x, y in map(parse_tile_str, tiles)]
+    return cycle(specs), len(specs)
 
 # ------------------------------ Normalization -------------------------------
+# Coercers take the exact-type fast path for values JSON already decoded as
+# numbers/strings; anything else goes through the original str() parse.
 def _to_float(x: Any) -> Optional[float]:
     if x is None: return None
-    try: return float(str(x).strip())
+    t = type(x)
+    if t is float: return x
+    if t is int: return float(x)
+    try: return float(x if t is str else str(x).strip())
     except Exception: return None
 
 def _to_int(x: Any) -> Optional[int]:
     if x is None: return None
-    try: return int(float(str(x).strip()))
+    t = type(x)
+    if t is int: return x
+    try: return int(x if t is float else float(x if t is str else str(x).strip()))
     except Exception: return None
 
 def _to_str(x: Any) -> Optional[str]:
     if x is None: return None
-    s = str(x).strip()
+    s = (x if type(x) is str else str(x)).strip()
     return s or None
 
 def _utcnow() -> datetime:
@@ -369,13 +480,13 @@ def classify_src(row: Dict[str, Any]) -> str:
     """
     Classify data source as 'sat' or 'terrestrial' for stamping in ais_fix.src.
     """
-    name = (row.get("SHIPNAME") or "").strip().upper()
-    ship_id = str(row.get("SHIP_ID") or "")
-    # crude SAT hints: placeholder name or opaque/base64-ish ship_id tokens
-    looks_opaque = (any(c in ship_id for c in ("=", "/", "+")) and len(ship_id) > 16) or not ship_id.isdigit()
-    if name == "[SAT-AIS]" or looks_opaque:
+    ship_id = row.get("SHIP_ID")
+    # crude SAT hints: placeholder name or opaque/base64-ish ship_id tokens.
+    # Any '=', '/', '+' already fails isdigit(), so isdigit() alone decides "opaque".
+    if not (ship_id if type(ship_id) is str else str(ship_id or "")).isdigit():
         return "sat"
-    return "terrestrial"
+    name = (row.get("SHIPNAME") or "").strip().upper()
+    return "sat" if name == "[SAT-AIS]" else "terrestrial"
 
 def tanker_predicate(row: Dict[str, Any]) -> bool:
     """
@@ -428,7 +539,12 @@ def make_vessel_uid(row: Dict[str, Any]) -> str:
     length = _norm(row.get("LENGTH"))
     width  = _norm(row.get("WIDTH"))
     stype  = _norm(row.get("SHIPTYPE") or row.get("TYPE_NAME"))
-    parts  = [name, flag, length, width, stype]
+    return _surrogate_uid(name, flag, length, width, stype)
+
+@lru_cache(maxsize=8192)
+def _surrogate_uid(*parts: str) -> str:
+    # Same vessel shows up on several tiles/cycles; hash each identity once.
+    # Stays SHA-1: the digest *is* the stored vessel_uid, so changing it would split tracks.
     h = hashlib.sha1("||".join(parts).encode("utf-8")).hexdigest()
     return f"h:{h[:16]}"
 
@@ -452,6 +568,23 @@ class BBox:
 
 AREA_BBOXES: List[BBox] = []
 
+# One long-lived connection for the whole run; reopened only if it drops.
+_PG_CONN: Optional["psycopg.Connection"] = None
+
+def get_conn() -> "psycopg.Connection":
+    global _PG_CONN
+    if _PG_CONN is None or _PG_CONN.closed or _PG_CONN.broken:
+        _PG_CONN = psycopg.connect(PG_DSN)
+        logger.info("db: connected")
+    return _PG_CONN
+
+def close_conn() -> None:
+    global _PG_CONN
+    if _PG_CONN is not None:
+        try: _PG_CONN.close()
+        except Exception: pass
+    _PG_CONN = None
+
 def load_area_bboxes() -> None:
     """
     Load buffered bounding boxes for public.area and public.area_gate.
@@ -470,30 +603,43 @@ def load_area_bboxes() -> None:
     SELECT ST_XMin(g) AS xmin, ST_YMin(g) AS ymin, ST_XMax(g) AS xmax, ST_YMax(g) AS ymax FROM all_geoms;
     """
     try:
-        with psycopg.connect(PG_DSN) as conn, conn.cursor(row_factory=dict_row) as cur:
+        conn = get_conn()
+        with conn.cursor(row_factory=dict_row) as cur:
             cur.execute(sql)
             for r in cur.fetchall():
                 AREA_BBOXES.append(BBox(r["xmin"], r["ymin"], r["xmax"], r["ymax"]))
+        conn.commit()  # don't leave the shared connection idle in transaction
         logger.info("prefilter: loaded %d buffered bboxes", len(AREA_BBOXES))
     except Exception as e:
         logger.exception("prefilter: failed to load bboxes: %s", e)
         AREA_BBOXES = []
+    _rebuild_bbox_index()
 
-def in_any_bbox(lon: float, lat: float) -> bool:
-    if not AREA_BBOXES:
-        return True  # no prefiltering; let DB handle it
-    for b in AREA_BBOXES:
-        if b.xmin <= lon <= b.xmax and b.ymin <= lat <= b.ymax:
-            return True
-    return False
+# AREA_BBOXES as (R,) arrays for whole-tile tests in in_any_bbox_vec
+_BBOX_ARR: Optional[Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]] = None
+
+def _rebuild_bbox_index() -> None:
+    global _BBOX_ARR
+    _BBOX_ARR = tuple(
+        np.array([getattr(b, f) for b in AREA_BBOXES], dtype=float) for f in ("xmin", "ymin", "xmax", "ymax")
+    ) if AREA_BBOXES else None
+
+def in_any_bbox_vec(lons: np.ndarray, lats: np.ndarray) -> np.ndarray:
+    """(N,) bool, True where the point is in any prefetch bbox."""
+    if _BBOX_ARR is None:
+        return np.ones(lons.shape, dtype=bool)  # no prefiltering; let DB handle it
+    xmin, ymin, xmax, ymax = _BBOX_ARR
+    lo, la = lons[:, None], lats[:, None]
+    return ((lo >= xmin) & (lo <= xmax) & (la >= ymin) & (la <= ymax)).any(axis=1)
 
 # ------------------------ Backoff fetch wrapper -----------------------------
-def fetch_with_backoff(driver, z, x, y, idx, max_retries=MAX_RETRIES) -> Optional[dict]:
+def fetch_with_backoff(client, z, x, y, idx, max_retries=MAX_RETRIES, url: Optional[str] = None) -> Optional[dict]:
+    url = url or tile_url(z, x, y)
     attempt = 0
     while True:
-        payload = fetch_once(driver, tile_url(z, x, y), wait_seconds=10)
+        payload = fetch_once(client, url)
 
-        ok = bool(payload and payload.get("data", {}).get("rows"))
+        ok = payload is NOT_MODIFIED or bool(payload and payload.get("data", {}).get("rows"))
         if ok:
             if attempt > 0:
                 logger.warning(
@@ -516,6 +662,29 @@ def fetch_with_backoff(driver, z, x, y, idx, max_retries=MAX_RETRIES) -> Optiona
         time.sleep(sleep_s)
         attempt += 1
 
+_RNG = np.random.default_rng()   # per-cycle tile order + pacing jitter
+
+def fetch_tiles(tiles: List[TileSpec]) -> List[Optional[dict]]:
+    """
+    Fetch one cycle's tiles on FETCH_WORKERS threads sharing the pooled client.
+    Tile i is released at ~i * (TILE_PAUSE_MS ± jitter) / FETCH_WORKERS after the
+    start, so pacing is kept while the network waits overlap. Results keep input order.
+    """
+    client = get_http_client()
+    # all release offsets for the cycle in one draw: cumulative jittered gaps, first tile at 0
+    gaps = np.maximum(0.0, (TILE_PAUSE_MS + _RNG.uniform(-TILE_JITTER_MS, TILE_JITTER_MS, len(tiles))) / 1000.0)
+    offsets = np.concatenate(([0.0], np.cumsum(gaps / FETCH_WORKERS)[:-1])).tolist()
+    start = time.monotonic()
+
+    def _one(job):
+        idx, (z, x, y, url, _tile_id), offset = job
+        time.sleep(max(0.0, start + offset - time.monotonic()))
+        return fetch_with_backoff(client, z, x, y, idx, max_retries=MAX_RETRIES, url=url)
+
+    jobs = [(idx, tile, off) for idx, (tile, off) in enumerate(zip(tiles, offsets), start=1)]
+    with ThreadPoolExecutor(max_workers=FETCH_WORKERS) as ex:
+        return list(ex.map(_one, jobs))
+
 # ------------------------ JSON → normalized rows ----------------------------
 def derive_ts(fetch_ts: datetime, elapsed_min_val: Any) -> Optional[datetime]:
     """
@@ -532,17 +701,55 @@ def derive_ts(fetch_ts: datetime, elapsed_min_val: Any) -> Optional[datetime]:
         return None
     return fetch_ts - timedelta(minutes=em)
 
-def normalize_rows_from_payload(payload: Dict[str, Any], tile_id: str) -> List[Dict[str, Any]]:
+# Normalized fixes are plain tuples in FIX_COLUMNS order (ts, src, vessel_uid, lat,
+# lon, sog, then FIELD_COERCIONS) -- what COPY/UNNEST consume, no per-row dict.
+FixRow = Tuple[Any, ...]
+
+# Remaining ais_fix columns: (column, payload key, coercer), in FIX column order.
+FIELD_COERCIONS: Tuple[Tuple[str, str, Any], ...] = (
+    ("cog",         "COURSE",      _to_float),
+    ("heading",     "HEADING",     _to_int),
+    ("elapsed",     "ELAPSED",     _to_int),
+    ("destination", "DESTINATION", _to_str),
+    ("flag",        "FLAG",        _to_str),
+    ("length_m",    "LENGTH",      _to_float),
+    ("width_m",     "WIDTH",       _to_float),
+    ("dwt",         "DWT",         _to_int),
+    ("shipname",    "SHIPNAME",    _to_str),
+    ("shiptype",    "SHIPTYPE",    _to_int),    # may be None; DB accepts NULL
+    ("ship_id",     "SHIP_ID",     _to_str),    # keep as text for provenance
+    ("rot",         "ROT",         _to_float),
+)
+
+def normalize_rows_from_payload(payload: Dict[str, Any], tile_id: str) -> List[FixRow]:
     """
-    Transform MarineTraffic payload (data.rows) into a list of records ready for
+    Transform MarineTraffic payload (data.rows) into FixRow tuples ready for
     insertion into public.ais_fix. Applies tanker filter, source classification,
     vessel identity creation, SAT continuity, idempotency, and optional bbox prefilter.
     """
     rows = payload.get("data", {}).get("rows", []) if payload else []
     fetch_ts = _utcnow()
-
-    out: List[Dict[str, Any]] = []
-    for r in rows:
+    if not rows:
+        return []
+
+    # Vectorised numeric gates over the whole tile: coords in range and SOG cap.
+    # None/unparsable values become NaN, which fails the range test (dropped) and
+    # passes the SOG cap (kept), exactly like the scalar checks did.
+    lat_a = np.array([_to_float(r.get("LAT")) for r in rows], dtype=float)
+    lon_a = np.array([_to_float(r.get("LON")) for r in rows], dtype=float)
+    speeds = [_to_float(r.get("SPEED")) for r in rows]
+    sog_a = np.array(speeds, dtype=float) / 10.0  # MarineTraffic SPEED looks like deciknots; normalize to knots
+    keep = (lat_a >= -90.0) & (lat_a <= 90.0) & (lon_a >= -180.0) & (lon_a <= 180.0)
+    keep &= ~(sog_a > MAX_TANKER_SOG_KN)  # allow zero/low speeds, but drop absurd movers
+    # Cheap spatial prefilter to avoid DB inserts far from areas
+    if ENABLE_BBOX_PREFILTER and keep.any():
+        idx = np.flatnonzero(keep)
+        keep[idx] = in_any_bbox_vec(lon_a[idx], lat_a[idx])
+    lats, lons, sogs = lat_a.tolist(), lon_a.tolist(), sog_a.tolist()
+
+    out: List[FixRow] = []
+    for i in np.flatnonzero(keep).tolist():
+        r = rows[i]
         # 0) Only tankers
         if not tanker_predicate(r):
             continue
@@ -552,17 +759,8 @@ def normalize_rows_from_payload(payload: Dict[str, Any], tile_id: str) -> List[D
         if ts is None:
             continue
 
-        # 2) coords
-        lat = _to_float(r.get("LAT"))
-        lon = _to_float(r.get("LON"))
-        if lat is None or lon is None:
-            continue
-        if not (-90.0 <= lat <= 90.0 and -180.0 <= lon <= 180.0):
-            continue
-
-        # Cheap spatial prefilter to avoid DB inserts far from areas
-        if ENABLE_BBOX_PREFILTER and not in_any_bbox(lon, lat):
-            continue
+        # 2) coords (range- and bbox-checked above)
+        lat, lon = lats[i], lons[i]
 
         # 3) source & kinematics
         src = classify_src(r)
@@ -570,78 +768,91 @@ def normalize_rows_from_payload(payload: Dict[str, Any], tile_id: str) -> List[D
             # DROP SAT SIGNAL AS TOO JITTERY FOR NOW
             continue
 
-        # MarineTraffic SPEED looks like deciknots; normalize to knots
-        sog = _to_float(r.get("SPEED"))
-        sog = sog / 10.0 if sog is not None else None
-        if sog is not None and sog > MAX_TANKER_SOG_KN:
-            # allow zero/low speeds, but drop absurd movers
-            continue
-        cog = _to_float(r.get("COURSE"))
-        heading = _to_int(r.get("HEADING"))
-        rot = _to_float(r.get("ROT"))
-        elapsed = _to_int(r.get("ELAPSED"))
+        sog = sogs[i] if speeds[i] is not None else None
 
         # 4) identity & continuity
         vuid = make_vessel_uid(r)
 
         # 5) project into ais_fix columns (DB triggers will enrich geom/memberships)
-        rec: Dict[str, Any] = {
-            "ts": ts,
-            "src": src,
-            "vessel_uid": vuid,
-            "lat": lat,
-            "lon": lon,
-            "sog": sog,
-            "cog": cog,
-            "heading": heading,
-            "elapsed": elapsed,
-            "destination": _to_str(r.get("DESTINATION")),
-            "flag": _to_str(r.get("FLAG")),
-            "length_m": _to_float(r.get("LENGTH")),
-            "width_m": _to_float(r.get("WIDTH")),
-            "dwt": _to_int(r.get("DWT")),
-            "shipname": _to_str(r.get("SHIPNAME")),
-            "shiptype": _to_int(r.get("SHIPTYPE")),  # may be None; DB accepts NULL
-            "ship_id": _to_str(r.get("SHIP_ID")),    # keep as text for provenance
-            "rot": rot
-        }
-        out.append(rec)
-
-    # (Optional) stable eventization: order by vessel then ts
-    out.sort(key=lambda r: (r["vessel_uid"] or "", r["ts"]))
+        out.append((ts, src, vuid, lat, lon, sog,
+                    *[conv(r.get(key)) for _col, key, conv in FIELD_COERCIONS]))
+
+    # Stable eventization: order by vessel then ts. Not optional: the dedupe trigger's
+    # retrograde guard drops fixes older than the vessel's newest stored ts.
+    # make_vessel_uid always returns a str, so a C-level itemgetter key is enough.
+    out.sort(key=itemgetter(2, 0))   # (vessel_uid, ts)
     return out
 
 # ------------------------------ DB I/O --------------------------------------
-INSERT_FIX_SQL = """
-INSERT INTO public.ais_fix
-( ts, src, vessel_uid,
-  lat, lon, sog, cog, heading, elapsed,
-  destination, flag, length_m, width_m, dwt, shipname, shiptype, ship_id, rot
+FIX_COLUMNS = (
+    "ts", "src", "vessel_uid",
+    "lat", "lon", "sog", "cog", "heading", "elapsed",
+    "destination", "flag", "length_m", "width_m", "dwt", "shipname", "shiptype", "ship_id", "rot",
 )
-VALUES
-( %(ts)s, %(src)s, %(vessel_uid)s,
-  %(lat)s, %(lon)s, %(sog)s, %(cog)s, %(heading)s, %(elapsed)s,
-  %(destination)s, %(flag)s, %(length_m)s, %(width_m)s, %(dwt)s,
-  %(shipname)s, %(shiptype)s, %(ship_id)s, %(rot)s
-);
+# FixRow layout must track the column list
+assert FIX_COLUMNS[6:] == tuple(c for c, _, _ in FIELD_COERCIONS)
+
+# Binary COPY needs exact wire types; keep in step with public.ais_fix in db/init.sql
+FIX_COPY_TYPES = [
+    "timestamptz", "text", "text",
+    "float8", "float8", "float4", "float4", "int2", "int4",
+    "text", "text", "float4", "float4", "int4", "text", "int2", "text", "float4",
+]
+
+# One statement per batch: the rows travel as 18 column arrays and are unnested
+# server-side. WITH ORDINALITY + ORDER BY keeps the (vessel, ts) input order the
+# dedupe trigger relies on.
+INSERT_FIX_SQL = f"""
+INSERT INTO public.ais_fix ({', '.join(FIX_COLUMNS)})
+SELECT {', '.join(FIX_COLUMNS)}
+FROM unnest({', '.join(f'%s::{t}[]' for t in FIX_COPY_TYPES)})
+     WITH ORDINALITY AS t({', '.join(FIX_COLUMNS)}, ord)
+ORDER BY ord
 """
 
-def insert_fixes(rows: List[Dict[str, Any]], batch_size: int = 2000) -> int:
+# COPY still fires the BEFORE ROW triggers (geom, memberships, dedupe) row by row,
+# and each trigger sees the rows copied before it, so semantics match INSERT.
+COPY_FIX_SQL = f"COPY public.ais_fix ({', '.join(FIX_COLUMNS)}) FROM STDIN (FORMAT BINARY)"
+COPY_MIN_ROWS = 100   # below this, one UNNEST insert is cheaper than setting up a COPY
+PIPELINE_SUPPORTED = psycopg.Pipeline.is_supported()   # libpq >= 14
+
+def insert_fixes(rows: List[FixRow], conn: Optional["psycopg.Connection"] = None) -> int:
     """
-    Bulk insert normalized rows into public.ais_fix.
+    Bulk insert normalized rows into public.ais_fix on the shared connection.
+    Streams through COPY FROM STDIN; small batches use one prepared UNNEST insert.
     Returns count of rows **attempted**; true inserts may be lower due to DB dedupe trigger.
     """
     if not rows:
         return 0
     inserted = 0
-    with psycopg.connect(PG_DSN) as conn:
+    conn = conn or get_conn()
+    try:
         with conn.cursor() as cur:
-            for i in range(0, len(rows), batch_size):
-                chunk = rows[i:i+batch_size]
-                cur.executemany(INSERT_FIX_SQL, chunk)
+            if len(rows) < COPY_MIN_ROWS:
+                cols = [list(c) for c in zip(*rows)]
+                if PIPELINE_SUPPORTED:
+                    # send the INSERT and the COMMIT back-to-back; one sync at block exit
+                    with conn.pipeline():
+                        cur.execute(INSERT_FIX_SQL, cols, prepare=True)
+                        conn.commit()
+                else:
+                    cur.execute(INSERT_FIX_SQL, cols, prepare=True)
+                    conn.commit()
                 # rowcount reports rows processed; dedupe trigger may drop them silently
-                inserted += cur.rowcount if cur.rowcount is not None else len(chunk)
-        conn.commit()
+                inserted += cur.rowcount if cur.rowcount is not None else len(rows)
+            else:
+                # COPY can't run inside a pipeline; it is a single streamed statement anyway
+                with cur.copy(COPY_FIX_SQL) as cp:
+                    cp.set_types(FIX_COPY_TYPES)
+                    for rec in rows:
+                        cp.write_row(rec)
+                inserted += len(rows)
+                conn.commit()
+    except Exception:
+        # keep the shared connection usable for the next tile
+        if not conn.closed:
+            conn.rollback()
+        raise
     return inserted
 
 
@@ -653,7 +864,7 @@ def main() -> None:
 
     load_area_bboxes()  # no-op unless ENABLE_BBOX_PREFILTER=1
 
-    driver = open_driver(minimized=True, size=(400, 300))
+    get_http_client()
     tile_iter, total_tiles = build_tile_cycle()
 
     setup_msg = f"[SETUP] tiles={total_tiles} | per_cycle={TILES_PER_CYCLE} | interval={INTERVAL_SECONDS}s"
@@ -663,24 +874,23 @@ def main() -> None:
     try:
         if USE_RICH:
             with Live(_renderable(), console=console, refresh_per_second=10, transient=True) as live:
-                _run_loop(driver, tile_iter, total_tiles)
+                _run_loop(tile_iter, total_tiles)
         else:
             _refresh()
-            _run_loop(driver, tile_iter, total_tiles)
+            _run_loop(tile_iter, total_tiles)
     except KeyboardInterrupt:
         pass
     finally:
         ui_disable()
         print("[INFO] stopping collector.")
-        try: safe_quit(driver)
-        except: pass
-        logger.info("browser closed")
-        print("[INFO] browser closed.")
+        close_http_client()
+        close_conn()
+        logger.info("http client closed")
+        print("[INFO] http client closed.")
 
-def _run_loop(driver, tile_iter, total_tiles):
+def _run_loop(tile_iter, total_tiles):
     import time
     from itertools import islice
-    from random import shuffle, uniform
 
     cycles = 0
 
@@ -691,14 +901,11 @@ def _run_loop(driver, tile_iter, total_tiles):
         kept_total = 0      # rows kept after normalization/filters
         inserted_total = 0  # attempted inserts (DB may dedupe)
 
-        # recycle webdriver periodically
+        # refresh cookies/session periodically
         if cycles % CYCLES_PER_DRIVER == 0 and cycles != 0:
-            try:
-                safe_quit(driver)
-            except Exception:
-                pass
-            driver = open_driver(minimized=True, size=(400, 300))
-            logger.info("recycled browser")
+            close_http_client()
+            get_http_client()
+            logger.info("recycled http session")
 
 
         # pull the next batch for this cycle
@@ -708,13 +915,21 @@ def _run_loop(driver, tile_iter, total_tiles):
             cycles += 1
             continue
       
-        shuffle(tiles_this_cycle)
+        tiles_this_cycle = [tiles_this_cycle[i] for i in _RNG.permutation(len(tiles_this_cycle))]
         failed_tiles = 0
+        unchanged_tiles = 0
+
+        # fetch the whole batch concurrently, staggering the start times so requests
+        # still trickle out at ~TILE_PAUSE_MS/FETCH_WORKERS instead of bursting
+        payloads = fetch_tiles(tiles_this_cycle)
 
-        for idx, (z, x, y) in enumerate(tiles_this_cycle, start=1):
-            tile_id = f"{z}, {x}, {y}"
+        for idx, ((z, x, y, _url, tile_id), payload) in enumerate(zip(tiles_this_cycle, payloads), start=1):
+
+            if payload is NOT_MODIFIED:
+                unchanged_tiles += 1
+                ui_set_bottom(f"[FETCH] tile {idx}/{TILES_PER_CYCLE} — z:{z} x:{x} y:{y} (304 unchanged)")
+                continue
 
-            payload = fetch_with_backoff(driver, z, x, y, idx, max_retries=MAX_RETRIES)
             ok = bool(payload and payload.get("data", {}).get("rows"))
             if not ok:
                 failed_tiles += 1
@@ -725,7 +940,7 @@ def _run_loop(driver, tile_iter, total_tiles):
 
             batch = normalize_rows_from_payload(payload, tile_id)
             kept_total += len(batch)
-            ins = insert_fixes(batch)
+            ins = insert_fixes(batch, get_conn())
             inserted_total += ins
 
 
@@ -734,24 +949,22 @@ def _run_loop(driver, tile_iter, total_tiles):
                 f"[FETCH] tile {idx}/{TILES_PER_CYCLE} — z:{z} x:{x} y:{y} "
                 f"(recv={len(rows_raw)} kept={len(batch)} ins={ins})"
             )
-
-            # gentle pacing between tiles
-            tile_jitter = random.uniform(-TILE_JITTER_MS, TILE_JITTER_MS)
-            time.sleep(max(0.0, (TILE_PAUSE_MS + tile_jitter) / 1000.0))
         
         cycles+=1
 
-        # Refresh Caggs/MVs
-        from maintenance import refresh_all
-        refresh_all(backfill_days=2)
+        # Refresh Caggs/MVs (every few cycles; dashboards don't need 150s freshness)
+        if cycles % REFRESH_EVERY_CYCLES == 0:
+            refresh_all(backfill_days=2)
 
         # per-cycle summary
         now_str = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
         summary = (f"[LATEST] {now_str} | received={received_total} | kept={kept_total} | "
-                   f"inserted={inserted_total} | (tiles this cycle={TILES_PER_CYCLE-failed_tiles}/{TILES_PER_CYCLE})")
+                   f"inserted={inserted_total} | unchanged={unchanged_tiles} | "
+                   f"(tiles this cycle={TILES_PER_CYCLE-failed_tiles}/{TILES_PER_CYCLE})")
         ui_set_latest(summary)
-        logger.info("cycle summary: received=%s kept=%s inserted=%s tiles=%s/%s",
-                    received_total, kept_total, inserted_total, TILES_PER_CYCLE-failed_tiles, TILES_PER_CYCLE)
+        logger.info("cycle summary: received=%s kept=%s inserted=%s unchanged=%s tiles=%s/%s",
+                    received_total, kept_total, inserted_total, unchanged_tiles,
+                    TILES_PER_CYCLE-failed_tiles, TILES_PER_CYCLE)
 
 
         # backoff/cooldown if many tiles failed; optionally recycle session
@@ -768,11 +981,10 @@ def _run_loop(driver, tile_iter, total_tiles):
                 ui_set_bottom(
                     f"[RECYCLE] fail_ratio={fail_ratio:.2f} (failed={failed_tiles} of {TILES_PER_CYCLE}) → sleeping {COOLDOWN_TIME}s"
                 )
-                try: driver.quit()
-                except Exception as e: logger.exception("driver_quit_error: %s", e)
+                close_http_client()
                 if COOLDOWN_TIME > 0:
                     time.sleep(COOLDOWN_TIME)
-                driver = open_driver(minimized=True, size=(400, 300))
+                get_http_client()
                 logger.info("session_recycle_complete")
                 continue
 
@@ -791,7 +1003,9 @@ def _run_loop(driver, tile_iter, total_tiles):
         jitter = random.uniform(-JITTER_SECONDS, JITTER_SECONDS)
         sleep_for = max(0.0, sleep_for + jitter)
 
-        if sleep_for > 0:
+        if sleep_for > 0 and not _ui_active():
+            time.sleep(sleep_for)  # nobody is watching: one sleep, no redraws
+        elif sleep_for > 0:
             deadline = time.time() + sleep_for
             while True:
                 rem = int(round(deadline - time.time()))
@@ -799,7 +1013,9 @@ def _run_loop(driver, tile_iter, total_tiles):
                     ui_set_bottom("[NEXT] starting new cycle...")
                     time.sleep(0.3)
                     break
-                ui_set_bottom(f"[NEXT] next cycle in {rem:>3d}s")
+                # redraw every 5s, then every second for the last few
+                if rem % 5 == 0 or rem <= 5:
+                    ui_set_bottom(f"[NEXT] next cycle in {rem:>3d}s")
                 time.sleep(1)
 
 # ---------------------------------------------------------------------------
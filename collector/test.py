@@ -10,56 +10,101 @@ We try 4 common mappings:
   4) MT TMS,   z-1 (x//2, invert Y at z-1)
 
 Use the printed URLs to click/compare and see which one lines up for your setup.
+
+--batch Z0 Z1 instead writes every same-zoom MT XYZ URL for zooms Z0..Z1
+(4**z tiles per zoom) to stdout, one per line.
 """
 
 from __future__ import annotations
+import sys
 import argparse
+from functools import partial
+
+import numpy as np
 
 def invert_y_tms(z: int, y_xyz: int) -> int:
     """XYZ ↔ TMS Y conversion at zoom z."""
-    return (2**z - 1) - y_xyz
+    return ((1 << z) - 1) - y_xyz
+
+MT_URL_TEMPLATE = "https://www.marinetraffic.com/getData/get_data_json_4/z:{}/X:{}/Y:{}/station:{}"
+_mt_url_fmt = MT_URL_TEMPLATE.format    # bound once; takes (z, x, y, station)
+
+# Same URL as a bytes %-template (bytes has no .format) for the --batch writer
+_MT_URL_LINE = (MT_URL_TEMPLATE.replace("{}", "%d") + "\n").encode("ascii")
 
 def mt_url(z: int, x: int, y: int, station: int = 0) -> str:
-    return f"https://www.marinetraffic.com/getData/get_data_json_4/z:{z}/X:{x}/Y:{y}/station:{station}"
+    return _mt_url_fmt(z, x, y, station)
+
+# URLs per broadcast block in write_batch (bounds memory at high zooms)
+BATCH_BLOCK_CELLS = 1 << 20
+
+def write_batch(z0: int, z1: int, station: int = 0, out=None) -> None:
+    """Write every MT XYZ URL for zooms z0..z1 as pre-encoded bytes, one line each.
+
+    Each URL is "<head(z, x)><tail(y)>": the n heads and n tails per zoom are built
+    once as NumPy byte strings and joined by one broadcast np.char.add per block,
+    so no Python-level work happens per tile.
+    """
+    out = out or sys.stdout.buffer
+    p_z, p_x, p_y, p_s, p_end = _MT_URL_LINE.split(b"%d")
+    tail_end = p_s + b"%d" % station + p_end
+    for z in range(z0, z1 + 1):
+        n = 1 << z
+        idx = np.arange(n).astype("S")
+        heads = np.char.add(p_z + b"%d" % z + p_x, idx)
+        tails = np.char.add(np.char.add(p_y, idx), tail_end)
+        step = max(1, BATCH_BLOCK_CELLS // n)
+        for x0 in range(0, n, step):
+            block = np.char.add(heads[x0:x0 + step, None], tails[None, :])
+            out.write(b"".join(block.ravel().tolist()))
+    out.flush()
 
 def main():
     ap = argparse.ArgumentParser(description="OSM (XYZ) tile -> MarineTraffic station:0 candidate URLs")
-    ap.add_argument("--z", type=int, required=True, help="OSM zoom")
-    ap.add_argument("--x", type=int, required=True, help="OSM x")
-    ap.add_argument("--y", type=int, required=True, help="OSM y")
+    ap.add_argument("--z", type=int, help="OSM zoom")
+    ap.add_argument("--x", type=int, help="OSM x")
+    ap.add_argument("--y", type=int, help="OSM y")
     ap.add_argument("--station", type=int, default=0, help="MarineTraffic station id (default 0)")
+    ap.add_argument("--batch", type=int, nargs=2, metavar=("Z0", "Z1"),
+                    help="write all MT XYZ URLs for zooms Z0..Z1 instead of candidates")
     args = ap.parse_args()
 
-    z, x, y = args.z, args.x, args.y
-    print(f"# OSM XYZ: {z}/{x}/{y}\n")
+    if args.batch:
+        write_batch(args.batch[0], args.batch[1], args.station)
+        return
+    if args.z is None or args.x is None or args.y is None:
+        ap.error("--z, --x and --y are required unless --batch is given")
 
-    # 1) XYZ same zoom
-    print("[A] MT XYZ, same zoom")
-    print(mt_url(z, x, y, args.station), "\n")
-
-    # 2) TMS same zoom (invert Y at same z)
-    y_tms_same = invert_y_tms(z, y)
-    print("[B] MT TMS, same zoom (Y inverted)")
-    print(mt_url(z, x, y_tms_same, args.station), "\n")
+    z, x, y = args.z, args.x, args.y
+    url = partial(mt_url, station=args.station)
+    lines = [
+        f"# OSM XYZ: {z}/{x}/{y}\n",
+        # 1) XYZ same zoom
+        "[A] MT XYZ, same zoom",
+        url(z, x, y) + " \n",
+        # 2) TMS same zoom (invert Y at same z)
+        "[B] MT TMS, same zoom (Y inverted)",
+        url(z, x, invert_y_tms(z, y)) + " \n",
+    ]
 
-    # 3) XYZ z-1 (halve indices)
     if z > 0:
-        z_minus = z - 1
-        x_half = x // 2
-        y_half = y // 2
-        print("[C] MT XYZ, z-1 (x//2, y//2)")
-        print(mt_url(z_minus, x_half, y_half, args.station), "\n")
-
-        # 4) TMS z-1
-        y_tms_zminus = invert_y_tms(z_minus, y_half)
-        print("[D] MT TMS, z-1 (x//2, invert Y at z-1)")
-        print(mt_url(z_minus, x_half, y_tms_zminus, args.station), "\n")
+        # 3) XYZ z-1 (halve indices), 4) TMS z-1
+        zm, xh, yh = z - 1, x >> 1, y >> 1
+        lines += [
+            "[C] MT XYZ, z-1 (x//2, y//2)",
+            url(zm, xh, yh) + " \n",
+            "[D] MT TMS, z-1 (x//2, invert Y at z-1)",
+            url(zm, xh, invert_y_tms(zm, yh)) + " \n",
+        ]
     else:
-        print("# (z=0 has no z-1 candidates)")
+        lines.append("# (z=0 has no z-1 candidates)")
 
     # Optional: show the OSM raster for quick visual compare
-    print("# OSM PNG (for reference):")
-    print(f"https://tile.openstreetmap.org/{z}/{x}/{y}.png")
+    lines += [
+        "# OSM PNG (for reference):",
+        f"https://tile.openstreetmap.org/{z}/{x}/{y}.png",
+    ]
+    sys.stdout.write("\n".join(lines) + "\n")
 
 if __name__ == "__main__":
     main()
@@ -1,14 +1,22 @@
 # dashboard/app.py
 from __future__ import annotations
 
+import io
+import json
 import os
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
 from typing import Dict, Any, Optional, List
 
+import numpy as np
 import pandas as pd
 import streamlit as st
 from sqlalchemy import create_engine, text, bindparam
-from sqlalchemy.engine import Engine
-from datetime import datetime
+from sqlalchemy.sql.elements import TextClause
+from sqlalchemy.engine import Connection, Engine
+from datetime import date, datetime, timedelta, timezone
+from functools import lru_cache
 
 # -----------------------------
 # Config
@@ -36,24 +44,120 @@ PG_DSN = st.secrets.get("PG_DSN", os.getenv("PG_DSN", DEFAULT_DSN))
 # -----------------------------
 @st.cache_resource
 def get_engine() -> Engine:
+    # Shared by every Streamlit session: size for concurrent reruns, fail fast when
+    # exhausted, and reuse the most recently returned (warm) connection first.
     return create_engine(
         PG_DSN,
         pool_pre_ping=True,
         pool_recycle=1800,
-        pool_size=5,
-        max_overflow=5,
+        pool_size=20,
+        max_overflow=40,
+        pool_timeout=5,
+        pool_use_lifo=True,
+        # UTC as a startup option: once per physical connection, not a round-trip per query
+        connect_args={"options": "-c timezone=UTC"},
         future=True,
     )
 
-def fetch_df(sql: str, params: Optional[Dict[str, Any]] = None) -> pd.DataFrame:
-    engine = get_engine()
-    with engine.connect() as conn:
-        conn.execute(text("SET TIME ZONE 'UTC'"))
-        return pd.read_sql_query(text(sql), conn, params=params)
+# The SQL constants are fixed strings: build each text() clause (bind-param regex
+# parse) once per process, and for the COPY path the dialect-compiled form too.
+# SQLAlchemy's engine query cache then hits on the same construct every call.
+@lru_cache(maxsize=256)
+def sql_text(sql: str) -> TextClause:
+    return text(sql)
+
+@lru_cache(maxsize=64)
+def copy_compiled(sql: str):
+    return text(sql.strip().rstrip(";")).compile(dialect=get_engine().dialect)
+
+def fetch_df(sql: str, params: Optional[Dict[str, Any]] = None, arrow: bool = False,
+             conn: Optional[Connection] = None) -> pd.DataFrame:
+    """arrow=True returns pyarrow-backed columns: no numpy/object boxing, and
+    Streamlit's charts hand them to the browser without a second conversion.
+    conn: reuse a tab_conn() for several serial queries (one pool checkout and
+    pre-ping) instead of checking one out per call."""
+    if conn is None:
+        with get_engine().connect() as own:
+            return fetch_df(sql, params, arrow, own)
+    if arrow:
+        return pd.read_sql_query(sql_text(sql), conn, params=params, dtype_backend="pyarrow")
+    return pd.read_sql_query(sql_text(sql), conn, params=params)
+
+def tab_conn() -> Connection:
+    """One pooled connection for a tab's serial queries. AUTOCOMMIT, so a failed
+    query doesn't leave the rest of the tab in an aborted transaction (and no
+    BEGIN/ROLLBACK round-trips). Main thread only; pool workers check out their own."""
+    return get_engine().connect().execution_options(isolation_level="AUTOCOMMIT")
+
+def copy_df(sql: str, params: Optional[Dict[str, Any]] = None, text_cols: tuple = ()) -> pd.DataFrame:
+    """Large results: COPY (query) TO STDOUT as CSV into Arrow's multithreaded parser,
+    straight into columnar buffers (no per-row DB-API tuples or object columns).
+    psycopg2 only; :params are bound client-side. text_cols are kept as strings."""
+    import pyarrow as pa
+    import pyarrow.csv as pa_csv
+
+    compiled = copy_compiled(sql)
+    buf = io.BytesIO()
+    raw = get_engine().raw_connection()
+    try:
+        with raw.cursor() as cur:
+            query = cur.mogrify(str(compiled), compiled.construct_params(params or {}))
+            cur.copy_expert(f"COPY ({query.decode()}) TO STDOUT WITH CSV HEADER", buf)
+    finally:
+        raw.close()
+    buf.seek(0)
+    table = pa_csv.read_csv(buf, convert_options=pa_csv.ConvertOptions(
+        column_types={c: pa.string() for c in text_cols},
+        true_values=["t"], false_values=["f"],
+        # COPY writes NULL unquoted and '' quoted
+        strings_can_be_null=True, quoted_strings_can_be_null=False,
+    ))
+    # Arrow's C++ ISO8601 parser already typed date/timestamp columns; keep dates as
+    # datetime64 too, not per-row datetime.date objects for pandas to re-parse
+    return table.to_pandas(split_blocks=True, self_destruct=True, date_as_object=False)
+
+# Independent queries of one rerun run side by side on pooled connections; wall
+# time is the slowest query instead of the sum. Shared by all sessions.
+_POOL = ThreadPoolExecutor(max_workers=6, thread_name_prefix="dash-query")
+
+def submit(fn, *args, **kwargs) -> Future:
+    """Run fn in the query pool with this rerun's script context attached (the
+    st.cache_* loaders look it up). Call .result() where the data is rendered,
+    inside that section's try, so a failed query still errors only its section."""
+    from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
+    ctx = get_script_run_ctx()
+
+    def run():
+        add_script_run_ctx(threading.current_thread(), ctx)
+        return fn(*args, **kwargs)
+    return _POOL.submit(run)
 
 def q(sql: str, **params) -> pd.DataFrame:
     return fetch_df(sql, params)
 
+def _geojson_records(df: pd.DataFrame) -> List[Dict[str, Any]]:
+    out = []
+    for r in df.to_dict("records"):
+        try:
+            r["geojson"] = json.loads(r["geojson"])
+        except Exception:
+            continue
+        out.append(r)
+    return out
+
+def snap_tol(tol: float) -> float:
+    """Nearest tolerance the GeoJSON MVs are precomputed at."""
+    return min(GEOJSON_TOLS, key=lambda t: abs(t - tol))
+
+# Polygons change rarely: cache the simplified, parsed shapes per tolerance
+@st.cache_data(ttl=3600, show_spinner=False)
+def load_areas_geojson(tol: float) -> List[Dict[str, Any]]:
+    return _geojson_records(fetch_df(SQL_AREAS_GEOJSON, {"tol": tol}))
+
+@st.cache_data(ttl=3600, show_spinner=False)
+def load_gates_geojson(tol: float) -> List[Dict[str, Any]]:
+    return _geojson_records(fetch_df(SQL_GATES_GEOJSON, {"tol": tol}))
+
 # -----------------------------
 # Reusable SQL (new schema)
 # -----------------------------
@@ -83,25 +187,26 @@ SELECT
 FROM recent_snapshot;
 """
 
+# Polygons pre-simplified per tolerance (mv_area_geojson / mv_area_gate_geojson, db/init.sql)
+GEOJSON_TOLS = (0.002, 0.005, 0.01, 0.02)
+
 SQL_AREAS_GEOJSON = """
-SELECT
-  area_id, name, kind, subtype, "group",
-  ST_AsGeoJSON(ST_SimplifyPreserveTopology(geom, :tol)) AS geojson
-FROM public.area
+SELECT area_id, name, kind, subtype, "group", geojson
+FROM public.mv_area_geojson
+WHERE tol = CAST(:tol AS numeric)
 """
 
 SQL_GATES_GEOJSON = """
-SELECT
-  gate_id, area_id, name, kind, subtype, "group",
-  ST_AsGeoJSON(ST_SimplifyPreserveTopology(geom, :tol)) AS geojson
-FROM public.area_gate
+SELECT gate_id, area_id, name, kind, subtype, "group", geojson
+FROM public.mv_area_gate_geojson
+WHERE tol = CAST(:tol AS numeric)
 """
 
+# Real-time CAGG (features/caggs_and_mvs.sql): reads ~4 rows/hour, not every fix
 SQL_INGEST_RATE = """
-SELECT time_bucket('15 minutes', ts) AS minute, count(*) AS rows_inserted
-FROM public.ais_fix
-WHERE ts >= now() - make_interval(hours => :hours)
-GROUP BY 1
+SELECT minute, rows_inserted
+FROM public.ca_ingest_rate_15m
+WHERE minute >= now() - make_interval(hours => :hours)
 ORDER BY 1;
 """
 
@@ -143,14 +248,27 @@ WHERE kind in ('lane','chokepoint')
 ORDER BY name, area_id;
 """
 
+SQL_AREA_APPROACHES = """
+SELECT area_id, name FROM public.area
+WHERE kind='port' AND subtype='approach'
+ORDER BY name, area_id;
+"""
+
 # Latest fixes for map
+# Text columns of map fixes: keep as strings when read back from CSV (MMSI-style
+# vessel_uids would otherwise parse as integers)
+FIX_TEXT_COLS = ("vessel_uid", "shipname", "flag", "area_id_core", "area_id_approach", "lane_id")
+
+# Newest fix per vessel is maintained on ingest (public.latest_fix, upserted by
+# f_emit_events), so this is a scan of ~one row per vessel, not the hypertable
 SQL_LATEST_FIXES = """
-SELECT DISTINCT ON (vessel_uid)
+SELECT
   vessel_uid, ts, lat, lon, sog, cog, heading,
   shipname, shiptype, flag, length_m, width_m,
   area_id_core, area_id_approach, lane_id
-FROM public.ais_fix
-ORDER BY vessel_uid, ts DESC;
+FROM public.latest_fix
+WHERE ts >= now() - make_interval(hours => :hours)
+ORDER BY vessel_uid;
 """
 
 
@@ -188,6 +306,37 @@ WHERE lane_id = :lane_id AND day BETWEEN :start AND :end
 ORDER BY day;
 """
 
+# Routing tab in one round-trip: lane flows for :lanes, class-mix shares for :mix_lane
+# and ballast for :bal_lane over one window, as a long (kind, day, series, value)
+# union. Same expressions as SQL_CA_LANE_EWM / SQL_CA_CLASS_MIX / SQL_CA_BALLAST_EWM.
+SQL_ROUTING_BUNDLE = """
+WITH mix AS (
+  SELECT day,
+         COALESCE(dwt_vlcc,0)    AS vlcc,
+         COALESCE(dwt_suezmax,0) AS suez,
+         COALESCE(dwt_aframax,0) AS afra,
+         COALESCE(dwt_other,0)   AS oth
+  FROM public.ca_class_mix_daily
+  WHERE lane_id = :mix_lane AND day BETWEEN :start AND :end
+)
+SELECT 'flow' AS kind, day, lane_id AS series, laden_dwt_sum::float8 AS value
+FROM public.ca_lane_transit_daily
+WHERE lane_id = ANY(:lanes) AND day BETWEEN :start AND :end
+UNION ALL
+SELECT 'mix', day, s.series, s.value::float8
+FROM mix
+CROSS JOIN LATERAL (VALUES
+  ('vlcc_share_ewm',    CASE WHEN (vlcc+suez+afra+oth) > 0 THEN vlcc/(vlcc+suez+afra+oth) END),
+  ('suezmax_share_ewm', CASE WHEN (vlcc+suez+afra+oth) > 0 THEN suez/(vlcc+suez+afra+oth) END),
+  ('aframax_share_ewm', CASE WHEN (vlcc+suez+afra+oth) > 0 THEN afra/(vlcc+suez+afra+oth) END)
+) s(series, value)
+UNION ALL
+SELECT 'bal', day, 'ballast_dwt_ewm', ballast_dwt::float8
+FROM public.ca_ballast_return_daily
+WHERE lane_id = :bal_lane AND day BETWEEN :start AND :end
+ORDER BY day;
+"""
+
 # Transit time: use MV (daily) and alias p50 as *_ewm for compatibility
 SQL_MV_LANE_TT = """
 SELECT day, lane_id, p50_hours, p90_hours, mean_hours
@@ -247,11 +396,30 @@ FROM base
 ORDER BY day;
 """
 
-# Final features (if built)
-SQL_ML_FEATURES = """
+# Final features (if built). Column names of the relation (table, view or MV), so
+# the tab can project only the columns it charts
+SQL_ML_FEATURE_COLUMNS = """
+SELECT attname AS column_name
+FROM pg_attribute
+WHERE attrelid = to_regclass('public.ml_features_daily')
+  AND attnum > 0 AND NOT attisdropped
+ORDER BY attnum;
+"""
+
+# Preview: just the last 200 days of the window, newest first
+SQL_ML_FEATURES_TAIL = """
 SELECT *
 FROM public.ml_features_daily
 WHERE day BETWEEN :start AND :end
+ORDER BY day DESC
+LIMIT 200;
+"""
+
+# Chart: {cols} is a list of quoted identifiers from SQL_ML_FEATURE_COLUMNS
+SQL_ML_FEATURES = """
+SELECT day, {cols}
+FROM public.ml_features_daily
+WHERE day BETWEEN :start AND :end
 ORDER BY day;
 """
 
@@ -277,16 +445,86 @@ def friendly_ts(ts: Optional[pd.Timestamp]) -> str:
         return "—"
     return pd.to_datetime(ts).strftime("%H:%M:%S")
 
+def to_utc(col: pd.Series) -> pd.Series:
+    """day/bucket columns -> UTC datetimes. Strings take pandas' ISO8601 fast path
+    with per-value caching; the result is then localized/converted as a whole column
+    (utc=True would attach the zone per element). Typed columns (timestamptz from
+    the driver, Arrow timestamps) skip the parse; DATE objects are cast in one go."""
+    first = col.first_valid_index()
+    if col.dtype == object and first is not None and type(col[first]) is date:
+        # DATE values from the driver: one numpy cast instead of a per-element parse
+        col = pd.Series(np.asarray(col.to_numpy(), dtype="datetime64[ns]"), index=col.index, name=col.name)
+    if not pd.api.types.is_datetime64_any_dtype(col):  # numpy or Arrow timestamps
+        parsed = pd.to_datetime(col, format="ISO8601", cache=True)
+        if not pd.api.types.is_datetime64_any_dtype(parsed):
+            # mixed UTC offsets come back as objects (sessions run with timezone=UTC)
+            return pd.to_datetime(col, format="ISO8601", utc=True, cache=True)
+        col = parsed
+    return col.dt.tz_localize("UTC") if col.dt.tz is None else col.dt.tz_convert("UTC")
+
+def day_indexed(df: pd.DataFrame) -> pd.DataFrame:
+    """Daily frame -> indexed by its UTC day, sorted. Done once in the cached loaders
+    so every rerun reads df[cols] off the cached frame instead of rebuilding a
+    tz-aware DatetimeIndex per chart."""
+    df["day"] = to_utc(df["day"])
+    return df.set_index("day").sort_index()
+
+_I32 = np.iinfo(np.int32)
+
+def shrink(df: pd.DataFrame) -> pd.DataFrame:
+    """Narrow numeric columns before a chart/table ships the frame to the browser:
+    floats (and Arrow decimals) to float32, NULL-free integers to int32 when in range."""
+    narrow = {}
+    for c, col in df.items():
+        if pd.api.types.is_bool_dtype(col) or not pd.api.types.is_numeric_dtype(col):
+            continue
+        if (pd.api.types.is_integer_dtype(col) and not col.isna().any()
+                and (col.empty or (_I32.min <= col.min() and col.max() <= _I32.max))):
+            narrow[c] = np.int32
+        else:
+            narrow[c] = np.float32
+    return df.astype(narrow) if narrow else df
+
+# ~ plot width in px: more points than this can't be drawn, only shipped
+CHART_POINTS = 800
+
+def line_chart(df: pd.DataFrame, **kwargs) -> None:
+    """st.line_chart on at most ~CHART_POINTS rows: a time-indexed frame is averaged
+    into equal time bins (ratios stay meaningful), anything else is strided; then
+    shrink() before it goes to the browser."""
+    if len(df) > CHART_POINTS:
+        if pd.api.types.is_datetime64_any_dtype(df.index.dtype):
+            df = df.set_axis(pd.DatetimeIndex(df.index)).sort_index()
+            step = (df.index[-1] - df.index[0]) / CHART_POINTS
+            if step > pd.Timedelta(0):
+                df = df.resample(step).mean().dropna(how="all")
+        else:
+            df = df.iloc[::-(-len(df) // CHART_POINTS)]
+    st.line_chart(shrink(df), **kwargs)
+
+# Seed lookups (public.area) change only on reseed: fetch at most every 10 min
+@st.cache_data(ttl=600, show_spinner=False)
+def load_ports() -> pd.DataFrame:
+    return fetch_df(SQL_AREA_PORTS)
+
+@st.cache_data(ttl=600, show_spinner=False)
+def load_lanes() -> pd.DataFrame:
+    return fetch_df(SQL_LANES)
+
+@st.cache_data(ttl=600, show_spinner=False)
+def load_approaches() -> pd.DataFrame:
+    return fetch_df(SQL_AREA_APPROACHES)
+
 def list_port_area_ids() -> List[str]:
     try:
-        df = fetch_df(SQL_AREA_PORTS)
+        df = load_ports()
         return df["area_id"].tolist()
     except Exception:
         return []
 
 def list_lane_ids() -> List[str]:
     try:
-        df = fetch_df(SQL_LANES)
+        df = load_lanes()
         return df["lane_id"].tolist()
     except Exception:
         return []
@@ -294,12 +532,79 @@ def list_lane_ids() -> List[str]:
 # -----------------------------
 # Tabs (original + new analytics)
 # -----------------------------
+# Live-ish aggregates over ais_fix: absorb widget-driven reruns for a few seconds
+@st.cache_data(ttl=30, show_spinner=False)
+def load_overview(hours: int) -> pd.DataFrame:
+    return fetch_df(SQL_OVERVIEW, {"hours": hours})
+
+@st.cache_data(ttl=30, show_spinner=False)
+def load_ingest_rate(hours: int) -> pd.DataFrame:
+    return copy_df(SQL_INGEST_RATE, {"hours": hours})
+
+@st.cache_data(ttl=60, show_spinner=False)
+def load_occupancy_snapshot() -> pd.DataFrame:
+    return fetch_df(SQL_OCCUPANCY_SNAPSHOT)
+
+@lru_cache(maxsize=1)
+def _utc_date(minute: int) -> date:
+    return datetime.fromtimestamp(minute * 60, timezone.utc).date()
+
+def utc_today() -> date:
+    """Today's UTC date, computed at most once a minute (widget defaults and date
+    clamps call this on every rerun)."""
+    return _utc_date(int(time.time() // 60))
+
+def day_window(start, end):
+    """Clamp a date_input range to today (UTC): future end dates return no extra
+    rows, and equal windows share a load_daily cache entry for the whole day."""
+    return start, min(end, utc_today())
+
+@st.cache_data(ttl=300, show_spinner=False)
+def load_daily(sql: str, key: str, key_id: str, start, end) -> pd.DataFrame:
+    """Daily CAGG/MV series for one area or lane over [start, end]; key names the
+    SQL's id parameter (area_id | lane_id). Indexed by day."""
+    return day_indexed(fetch_df(sql, {key: key_id, "start": start, "end": end}, arrow=True))
+
+@st.cache_data(ttl=86400, show_spinner=False)
+def load_ml_feature_columns() -> List[str]:
+    return [c for c in fetch_df(SQL_ML_FEATURE_COLUMNS)["column_name"] if c != "day"]
+
+@st.cache_data(ttl=600, show_spinner=False)
+def load_ml_features_tail(start, end) -> pd.DataFrame:
+    return copy_df(SQL_ML_FEATURES_TAIL, {"start": start, "end": end}).iloc[::-1].reset_index(drop=True)
+
+def ml_features_sql(cols: tuple) -> str:
+    quote = get_engine().dialect.identifier_preparer.quote
+    return SQL_ML_FEATURES.format(cols=", ".join(quote(c) for c in cols))
+
+@st.cache_data(ttl=600, show_spinner=False)
+def load_ml_features(start, end, cols: tuple) -> pd.DataFrame:
+    return day_indexed(copy_df(ml_features_sql(cols), {"start": start, "end": end}))
+
+@st.cache_data(ttl=300, show_spinner=False)
+def load_routing_bundle(lanes: tuple, mix_lane: str, bal_lane: str, start, end) -> Dict[str, pd.DataFrame]:
+    """SQL_ROUTING_BUNDLE split by kind into wide frames indexed by day, one column
+    per series (lane_id for 'flow', the *_ewm names for 'mix' and 'bal')."""
+    # list, not tuple: psycopg2 adapts lists to ARRAY[...] for = ANY()
+    df = fetch_df(SQL_ROUTING_BUNDLE, {"lanes": list(lanes), "mix_lane": mix_lane, "bal_lane": bal_lane,
+                                       "start": start, "end": end}, arrow=True)
+    out = {kind: day_indexed(pd.DataFrame(columns=["day"])) for kind in ("flow", "mix", "bal")}
+    for kind, part in df.groupby("kind", sort=False):
+        wide = part.pivot(index="day", columns="series", values="value").reset_index()
+        wide.columns.name = None
+        out[kind] = day_indexed(wide)
+    return out
+
 def tab_overview(hours):
     st.markdown("## 🧭 Overview")
 
+    f_overview = submit(load_overview, hours)
+    f_rate = submit(load_ingest_rate, hours)
+    f_snap = submit(load_occupancy_snapshot)
+
     cols = st.columns([1.5,1.5,1.5,1.5])
     try:
-        df = fetch_df(SQL_OVERVIEW, {"hours": hours})
+        df = f_overview.result()
         unique_vessels = int(df.iloc[0]["unique_vessels"]) if not df.empty else 0
         last_ts = df.iloc[0]["last_ts"] if not df.empty else None
         in_port = int(df.iloc[0]["vessels_in_port"]) if not df.empty else 0
@@ -316,20 +621,20 @@ def tab_overview(hours):
     st.markdown("---")
     st.subheader("Ingestion rate (rows/hour)")
     try:
-        rate = fetch_df(SQL_INGEST_RATE, {"hours": hours})
+        rate = f_rate.result()
         if rate.empty:
             st.info("No data in the selected lookback.")
         else:
-            rate["minute"] = pd.to_datetime(rate["minute"], utc=True)
+            rate["minute"] = to_utc(rate["minute"])
             rate = rate.set_index("minute")
-            st.line_chart(rate["rows_inserted"])
+            line_chart(rate[["rows_inserted"]])
     except Exception as e:
         st.error(f"Could not load ingestion chart: {e}")
 
     st.markdown("---")
     st.subheader("Current port/approach snapshot")
     try:
-        snap = fetch_df(SQL_OCCUPANCY_SNAPSHOT)
+        snap = f_snap.result()
         if snap.empty:
             st.info("No vessels currently inside any configured areas.")
         else:
@@ -348,7 +653,7 @@ def tab_ports():
     st.markdown("## 🏗️ Ports & Occupancy (ad-hoc)")
 
     # Pick a port core/approach area_id
-    areas = fetch_df(SQL_AREA_PORTS)
+    areas = load_ports()
     if areas.empty:
         st.warning("No port areas found. Seed `public.area` first.")
         return
@@ -360,13 +665,23 @@ def tab_ports():
     days = st.slider("History window (days)", min_value=1, max_value=30, value=7, step=1)
 
     # If you later add an occupancy CAGG, call it here; for now do on-the-fly 5-min buckets
+    # One row per (bucket, vessel) first, so the outer counts are plain count(*)
+    # instead of a sort-based count(DISTINCT) per bucket
     sql_fallback = """
-    SELECT time_bucket('30 minutes', ts) AS bucket,
-           count(DISTINCT vessel_uid) FILTER (WHERE area_id_core = :aid) AS in_core,
-           count(DISTINCT vessel_uid) FILTER (WHERE area_id_approach = :aid AND area_id_core IS NULL) AS in_approach
-    FROM public.ais_fix
-    WHERE ts >= now() - make_interval(days => :days)
-      AND (:aid = :aid) -- binder
+    WITH per_vessel_bucket AS (
+      SELECT time_bucket('30 minutes', ts) AS bucket,
+             vessel_uid,
+             bool_or(area_id_core = :aid) AS in_core,
+             bool_or(area_id_approach = :aid AND area_id_core IS NULL) AS in_approach
+      FROM public.ais_fix
+      WHERE ts >= now() - make_interval(days => :days)
+        AND vessel_uid IS NOT NULL  -- count(DISTINCT vessel_uid) ignored NULLs
+      GROUP BY 1, 2
+    )
+    SELECT bucket,
+           count(*) FILTER (WHERE in_core)     AS in_core,
+           count(*) FILTER (WHERE in_approach) AS in_approach
+    FROM per_vessel_bucket
     GROUP BY 1
     ORDER BY 1;
     """
@@ -375,13 +690,12 @@ def tab_ports():
         st.info("No occupancy data for this window.")
         return
 
-    series["bucket"] = pd.to_datetime(series["bucket"], utc=True)
+    series["bucket"] = to_utc(series["bucket"])
     series = series.sort_values("bucket")
     st.write(f"**Time series occupancy (30-min buckets)** — {area_id}")
-    st.line_chart(series.set_index("bucket")[["in_core", "in_approach"]], width='stretch', height=280)
+    line_chart(series.set_index("bucket")[["in_core", "in_approach"]], width='stretch', height=280)
 
 def tab_map(map_age):
-    import json
     import folium
     from streamlit.components.v1 import html as st_html  # linter may warn; runtime is fine
 
@@ -389,36 +703,45 @@ def tab_map(map_age):
 
     # New: choose how many recent fixes per vessel to draw (1..5)
     top_n = st.slider("Recent fixes per vessel", 1, 10, 5, step=1)
+    renderer = st.radio("Renderer", ["WebGL (pydeck)", "Leaflet (folium)"], horizontal=True)
 
     # --- Data ---
     if top_n == 1:
         # retain your existing single-latest-per-vessel source
-        fixes = fetch_df(SQL_LATEST_FIXES)
+        fixes = copy_df(SQL_LATEST_FIXES, {"hours": int(map_age or 12)}, text_cols=FIX_TEXT_COLS)
     else:
-        # inline SQL to fetch last N fixes per vessel (ranked)
+        # inline SQL to fetch last N fixes per vessel (ranked): an N-row index
+        # probe per vessel rather than ROW_NUMBER() over every fix in the window
         SQL_LATEST_N_FIXES = """
-        WITH ranked AS (
+        SELECT f.*
+        FROM (
+          SELECT DISTINCT vessel_uid
+          FROM public.ais_fix
+          WHERE ts >= now() - make_interval(hours => :hours)
+        ) v
+        CROSS JOIN LATERAL (
           SELECT
             vessel_uid, ts, lat, lon, sog, cog, heading,
             shipname, shiptype, flag, length_m, width_m,
             area_id_core, in_core, area_id_approach, in_approach, lane_id, in_lane,
-            ROW_NUMBER() OVER (PARTITION BY vessel_uid ORDER BY ts DESC) AS rn
+            ROW_NUMBER() OVER (ORDER BY ts DESC) AS rn
           FROM public.ais_fix
-          WHERE ts >= now() - make_interval(hours => :hours)
-        )
-        SELECT *
-        FROM ranked
-        WHERE rn <= :n
-        ORDER BY vessel_uid, rn DESC;
+          WHERE vessel_uid = v.vessel_uid
+            AND ts >= now() - make_interval(hours => :hours)
+          ORDER BY ts DESC
+          LIMIT :n
+        ) f
+        ORDER BY f.vessel_uid, f.rn DESC;
         """
         # use the same lookback window as your page control
-        fixes = fetch_df(SQL_LATEST_N_FIXES, {"hours": int(map_age or 12), "n": int(top_n)})
+        fixes = copy_df(SQL_LATEST_N_FIXES, {"hours": int(map_age or 12), "n": int(top_n)}, text_cols=FIX_TEXT_COLS)
 
     # simplify polygons for speed (tune 0.002–0.02)
-    areas_poly = fetch_df(SQL_AREAS_GEOJSON, {"tol": 0.01})
-    gates_poly = fetch_df(SQL_GATES_GEOJSON, {"tol": 0.01})
+    tol = snap_tol(0.01)
+    areas_poly = load_areas_geojson(tol)
+    gates_poly = load_gates_geojson(tol)
 
-    # Filter fixes by lookback (still applied for the top_n == 1 path)
+    # Filter fixes by lookback (both queries already bound it server-side)
     if not fixes.empty and "ts" in fixes.columns:
         fixes["ts"] = pd.to_datetime(fixes["ts"], utc=True, errors="coerce")
         cutoff = pd.Timestamp.utcnow() - pd.Timedelta(hours=int(map_age or 12))
@@ -428,15 +751,13 @@ def tab_map(map_age):
             fixes[col] = pd.to_numeric(fixes[col], errors="coerce")
     fixes = fixes.dropna(subset=["lat", "lon"]) if not fixes.empty else fixes
 
-    # --- Base map (initial default; JS will override with persisted view) ---
-    m = folium.Map(
-        location=[35.0, -30.0],  # mid-Atlantic default; your persisted view will replace this
-        zoom_start=3,
-        tiles="CartoDB positron",
-        prefer_canvas=True,
-        control_scale=True,
-        zoom_control=True,
-    )
+    # Narrow dtypes before the layer build: float32 numerics, categorical labels
+    # (vessel_uid repeats top_n times per vessel; groupby hashes the codes)
+    fixes = fixes.astype({c: "float32" for c in ("lat", "lon", "sog", "cog", "heading", "length_m", "width_m")
+                          if c in fixes.columns})
+    for c in ("vessel_uid", "shipname", "shiptype", "flag", "area_id_core", "area_id_approach", "lane_id"):
+        if c in fixes.columns:
+            fixes[c] = fixes[c].astype("category")
 
     # ---- Style helpers ----
     def area_style(feat):
@@ -457,142 +778,227 @@ def tab_map(map_age):
     def gate_style(_feat):
         return {"color": "#111111", "weight": 3, "fillOpacity": 0.0}
 
-    # --- Areas polygons ---
-    if not areas_poly.empty:
+    AREA_PROPS = ("area_id", "name", "kind", "subtype", "group")
+    GATE_PROPS = ("gate_id", "area_id", "name", "kind", "subtype", "group")
+
+    def feature_collection(records, prop_keys):
+        return {
+            "type": "FeatureCollection",
+            "features": [
+                {"type": "Feature", "geometry": r["geojson"],
+                 "properties": {k: r.get(k) for k in prop_keys}}
+                for r in records
+            ],
+        }
+
+    def ship_colors(df):
+        if "shiptype" not in df.columns:
+            return np.full(len(df), "#7f8c8d")
+        stype = df["shiptype"].astype(object).fillna("").astype(str)
+        return np.where(stype.str.startswith("8"), "#e74c3c", "#7f8c8d")
+
+    def ship_names(df):
+        name = df["shipname"].astype(object) if "shipname" in df.columns else pd.Series(None, index=df.index, dtype=object)
+        name = name.where(name.fillna("").astype(str) != "", df["vessel_uid"].astype(object))
+        return name.where(name.fillna("").astype(str) != "", "Vessel").astype(str)
+
+    def lon_lat(df):
+        # float32 -> float64 widening prints ~16 digits; 5 dp (~1 m) keeps the HTML small
+        return (np.round(df["lon"].to_numpy(np.float64), 5),
+                np.round(df["lat"].to_numpy(np.float64), 5))
+
+    def fix_opacity(df):
+        # fade older points (newest brightest; rn 1 = newest)
+        if "rn" not in df.columns:
+            return 0.4
+        rn = df["rn"].astype(float)
+        max_rn = df.groupby("vessel_uid", observed=True)["rn"].transform("max").astype(float)
+        return (0.4 + 0.5 * ((max_rn - rn).clip(lower=0) / np.maximum(1, max_rn - 1))).to_numpy()
+
+    # --- WebGL path: one pydeck Deck; all fixes are a single ScatterplotLayer ---
+    if renderer.startswith("WebGL"):
+        import pydeck as pdk
+
+        def rgb(hex_colors):
+            # "#rrggbb" strings -> (n, 3) uint8; parse each distinct color once
+            uniq, inv = np.unique(np.asarray(hex_colors, dtype="U7"), return_inverse=True)
+            v = np.array([int(c[1:], 16) for c in uniq], dtype=np.uint32)[inv]
+            return np.stack(((v >> 16) & 255, (v >> 8) & 255, v & 255), axis=1).astype(np.uint8)
+
+        def styled(fc, style, id_key):
+            # folium style dicts -> deck.gl RGBA accessors; "tip" is read by the Deck tooltip
+            for f in fc["features"]:
+                sty, pr = style(f), f["properties"]
+                pr["line_rgba"] = rgb([sty["color"]])[0].tolist() + [255]
+                pr["fill_rgba"] = (rgb([sty.get("fillColor", sty["color"])])[0].tolist()
+                                   + [int(255 * sty.get("fillOpacity", 0.0))])
+                pr["line_w"] = sty["weight"]
+                f["tip"] = f"<b>{pr.get('name')}</b><br/>{pr.get('kind')} {pr.get('subtype')}<br/>{pr.get(id_key)}"
+            return fc
+
+        layers = []
+        for records, props, style in ((areas_poly, AREA_PROPS, area_style), (gates_poly, GATE_PROPS, gate_style)):
+            if records:
+                layers.append(pdk.Layer(
+                    "GeoJsonLayer", styled(feature_collection(records, props), style, props[0]),
+                    stroked=True, filled=True, pickable=True,
+                    get_fill_color="properties.fill_rgba", get_line_color="properties.line_rgba",
+                    get_line_width="properties.line_w", line_width_units="pixels",
+                ))
+
+        if not fixes.empty:
+            fixes = fixes.sort_values(["vessel_uid", "ts"]) if top_n > 1 else fixes
+            lon, lat = lon_lat(fixes)
+            color = rgb(ship_colors(fixes))
+            pts = pd.DataFrame({
+                "lon": lon, "lat": lat,
+                "color_r": color[:, 0], "color_g": color[:, 1], "color_b": color[:, 2],
+                "alpha": (np.broadcast_to(fix_opacity(fixes) if top_n > 1 else 0.8, len(fixes)) * 255).astype(np.uint8),
+                "radius": np.full(len(fixes), 300 if top_n == 1 else 900, dtype=np.uint16),
+            })
+            sog = fixes["sog"].astype("float64").round(1).astype(str) if "sog" in fixes.columns else "nan"
+            cog = fixes["cog"].astype("float64").round(1).astype(str) if "cog" in fixes.columns else "nan"
+            pts["tip"] = ("<b>" + ship_names(fixes) + "</b><br/>" + fixes["vessel_uid"].astype(str)
+                          + "<br/>" + fixes["ts"].astype(str) + "<br/>SOG " + sog + " kn | CoG " + cog).to_numpy()
+            if top_n > 1:
+                paths = [
+                    {"path": np.column_stack((lon[ix], lat[ix])).tolist(), "color": color[ix[-1]].tolist()}
+                    for ix in fixes.groupby("vessel_uid", sort=False, observed=True).indices.values()
+                    if len(ix) >= 2
+                ]
+                if paths:
+                    layers.append(pdk.Layer(
+                        "PathLayer", paths, get_path="path", get_color="color",
+                        get_width=2, width_units="pixels", opacity=0.7,
+                    ))
+            layers.append(pdk.Layer(
+                "ScatterplotLayer", pts, pickable=True,
+                get_position="[lon, lat]",
+                get_fill_color="[color_r, color_g, color_b, alpha]",
+                get_radius="radius", radius_min_pixels=2,
+            ))
+
+        st.pydeck_chart(pdk.Deck(
+            layers=layers,
+            initial_view_state=pdk.ViewState(latitude=35.0, longitude=-30.0, zoom=3),
+            map_style="light",
+            tooltip={"html": "{tip}"},
+        ))
+        return
+
+    # --- Base map (initial default; JS will override with persisted view) ---
+    m = folium.Map(
+        location=[35.0, -30.0],  # mid-Atlantic default; your persisted view will replace this
+        zoom_start=3,
+        tiles="CartoDB positron",
+        prefer_canvas=True,
+        control_scale=True,
+        zoom_control=True,
+    )
+
+    # --- Areas polygons (one layer for all features) ---
+    if areas_poly:
         fg_areas = folium.FeatureGroup(name="Areas (polygons)", show=True)
-        for _, r in areas_poly.iterrows():
-            try:
-                gj = json.loads(r["geojson"])
-            except Exception:
-                continue
-            props = {
-                "area_id": r["area_id"],
-                "name": r["name"],
-                "kind": r["kind"],
-                "subtype": r["subtype"],
-                "group": r.get("group"),
-            }
-            folium.GeoJson(
-                data={"type": "Feature", "geometry": gj, "properties": props},
-                style_function=area_style,
-                tooltip=folium.GeoJsonTooltip(
-                    fields=["name", "kind", "subtype", "area_id", "group"],
-                    aliases=["Name", "Kind", "Subtype", "Area ID", "Group"],
-                    sticky=True,
-                ),
-            ).add_to(fg_areas)
+        folium.GeoJson(
+            data=feature_collection(areas_poly, AREA_PROPS),
+            style_function=area_style,
+            tooltip=folium.GeoJsonTooltip(
+                fields=["name", "kind", "subtype", "area_id", "group"],
+                aliases=["Name", "Kind", "Subtype", "Area ID", "Group"],
+                sticky=True,
+            ),
+        ).add_to(fg_areas)
         fg_areas.add_to(m)
 
-    # --- Gates polygons ---
-    if not gates_poly.empty:
+    # --- Gates polygons (one layer for all features) ---
+    if gates_poly:
         fg_gates = folium.FeatureGroup(name="Gates", show=True)
-        for _, r in gates_poly.iterrows():
-            try:
-                gj = json.loads(r["geojson"])
-            except Exception:
-                continue
-            props = {
-                "gate_id": r["gate_id"],
-                "area_id": r["area_id"],
-                "name": r["name"],
-                "kind": r["kind"],
-                "subtype": r["subtype"],
-                "group": r.get("group"),
-            }
-            folium.GeoJson(
-                data={"type": "Feature", "geometry": gj, "properties": props},
-                style_function=gate_style,
-                tooltip=folium.GeoJsonTooltip(
-                    fields=["name", "kind", "subtype", "gate_id", "area_id"],
-                    aliases=["Name", "Kind", "Subtype", "Gate ID", "Parent Area"],
-                    sticky=True,
-                ),
-            ).add_to(fg_gates)
+        folium.GeoJson(
+            data=feature_collection(gates_poly, GATE_PROPS),
+            style_function=gate_style,
+            tooltip=folium.GeoJsonTooltip(
+                fields=["name", "kind", "subtype", "gate_id", "area_id"],
+                aliases=["Name", "Kind", "Subtype", "Gate ID", "Parent Area"],
+                sticky=True,
+            ),
+        ).add_to(fg_gates)
         fg_gates.add_to(m)
 
     # --- Ships layer ---
-    def color_and_radius(row):
-        stype = str(row.get("shiptype") or "")
-        color = "#e74c3c" if stype.startswith("8") else "#7f8c8d"
-        return color, 300
-
-    if not fixes.empty:
+    # Above this many points, cluster instead of drawing one circle per fix
+    CLUSTER_ABOVE = 5000
+    POPUP_FIELDS = ["name", "vessel_uid", "ts", "sog", "cog", "area_id_core", "area_id_approach", "lane_id"]
+    POPUP_ALIASES = ["Name", "UID", "ts", "SOG (kn)", "CoG", "core", "appr", "lane"]
+
+    def points_layer(df, colors, opacity, radius_m, layer):
+        """All fixes as one GeoJson of Points; per-point style rides in the properties."""
+        props = pd.DataFrame(
+            {c: (df[c] if c in df.columns else "") for c in POPUP_FIELDS[1:]}, index=df.index
+        )
+        for c in ("sog", "cog"):
+            if pd.api.types.is_float_dtype(props[c]):
+                props[c] = props[c].astype("float64").round(1)
+        props = props.astype(object)
+        props = props.where(props.notna(), "").astype(str)
+        props.insert(0, "name", ship_names(df))
+        lon, lat = lon_lat(df)
+        features = [
+            {
+                "type": "Feature",
+                "geometry": {"type": "Point", "coordinates": [x, y]},
+                "properties": {
+                    **dict(zip(POPUP_FIELDS, vals)),
+                    "style": {"color": c, "fillColor": c, "weight": 1, "fillOpacity": o},
+                },
+            }
+            for x, y, c, o, vals in zip(
+                lon.tolist(), lat.tolist(),
+                colors, np.broadcast_to(opacity, len(df)).tolist(),
+                props[POPUP_FIELDS].itertuples(index=False, name=None),
+            )
+        ]
+        folium.GeoJson(
+            data={"type": "FeatureCollection", "features": features},
+            marker=folium.Circle(radius=radius_m, fill=True),
+            style_function=lambda f: f["properties"]["style"],
+            tooltip=folium.GeoJsonTooltip(fields=["name"], labels=False),
+            popup=folium.GeoJsonPopup(fields=POPUP_FIELDS, aliases=POPUP_ALIASES, max_width=320),
+        ).add_to(layer)
+
+    if not fixes.empty and len(fixes) > CLUSTER_ABOVE:
+        from folium.plugins import FastMarkerCluster
+        lon, lat = lon_lat(fixes)
+        pts = np.column_stack((lat, lon, ship_names(fixes).to_numpy())).tolist()
+        FastMarkerCluster(data=pts, name="Ships (clustered)").add_to(m)
+    elif not fixes.empty:
+        colors = ship_colors(fixes)
         if top_n == 1:
-            # Original single-point behavior (keeps clustering threshold)
-            if len(fixes) > 12000:
-                from folium.plugins import FastMarkerCluster
-                pts = [
-                    [float(r["lat"]), float(r["lon"]), (r.get("shipname") or r.get("vessel_uid") or "Vessel")]
-                    for _, r in fixes.iterrows()
-                    if pd.notnull(r.get("lat")) and pd.notnull(r.get("lon"))
-                ]
-                FastMarkerCluster(data=pts, name="Ships (clustered)").add_to(m)
-            else:
-                for _, r in fixes.iterrows():
-                    lat, lon = float(r["lat"]), float(r["lon"])
-                    color, radius_m = color_and_radius(r)
-                    name = str(r.get("shipname") or r.get("vessel_uid") or "Vessel")
-                    sog = r.get("sog", "")
-                    popup_html = f"""
-                        <b>{name}</b><br/>
-                        UID: {r.get('vessel_uid','')}<br/>
-                        ts: {r.get('ts','')}<br/>SOG: {sog} kn | CoG: {r.get('cog','')}<br/>
-                        core: {r.get('area_id_core','')}<br/>
-                        appr: {r.get('area_id_approach','')}<br/>
-                        lane: {r.get('lane_id','')}
-                    """
-                    folium.Circle(
-                        location=[lat, lon],
-                        radius=radius_m,
-                        color=color, weight=1, fill=True, fill_color=color, fill_opacity=0.8,
-                        tooltip=name, popup=folium.Popup(popup_html, max_width=320),
-                    ).add_to(m)
+            points_layer(fixes, colors, 0.8, 300, m)
         else:
             # Plot last N fixes per vessel with a small trail
             fg_tracks = folium.FeatureGroup(name=f"Tracks (last {top_n})", show=True)
             fg_points = folium.FeatureGroup(name="Fixes", show=True)
 
-            for vuid, g in fixes.groupby("vessel_uid"):
-                g = g.sort_values("ts")  # oldest→newest
-                pts = list(zip(g["lat"].tolist(), g["lon"].tolist()))
-                if len(pts) >= 2:
-                    # color by most-recent point’s type
-                    color, _ = color_and_radius(g.iloc[-1])
-                    folium.PolyLine(
-                        locations=pts,
-                        color=color,
-                        weight=2,
-                        opacity=0.7,
-                    ).add_to(fg_tracks)
-
-                # fade older points (newest brightest)
-                has_rn = "rn" in g.columns
-                max_rn = int(g["rn"].max()) if has_rn else len(g)
-                for _, r in g.iterrows():
-                    color, _ = color_and_radius(r)
-                    rn = int(r["rn"]) if has_rn else max_rn  # 1=newest
-                    opacity = 0.4 + 0.5 * (max(0, (max_rn - rn)) / max(1, max_rn - 1))
-                    name = str(r.get("shipname") or r.get("vessel_uid") or "Vessel")
-                    sog = r.get("sog", "")
-                    popup_html = f"""
-                        <b>{name}</b><br/>
-                        UID: {r.get('vessel_uid','')}<br/>
-                        ts: {r.get('ts','')}<br/>SOG: {sog} kn | CoG: {r.get('cog','')}<br/>
-                        core: {r.get('area_id_core','')}<br/>
-                        appr: {r.get('area_id_approach','')}<br/>
-                        lane: {r.get('lane_id','')}
-                    """
-                    folium.Circle(
-                        location=[float(r["lat"]), float(r["lon"])],
-                        radius=900,
-                        color=color,
-                        weight=1,
-                        fill=True,
-                        fill_color=color,
-                        fill_opacity=float(opacity),
-                        tooltip=name,
-                        popup=folium.Popup(popup_html, max_width=320),
-                    ).add_to(fg_points)
+            # Trails oldest→newest, colored by each vessel's most-recent point
+            fixes = fixes.sort_values(["vessel_uid", "ts"])
+            colors = ship_colors(fixes)
+            lon, lat = lon_lat(fixes)
+            tracks = [
+                {
+                    "type": "Feature",
+                    "geometry": {"type": "LineString", "coordinates": np.column_stack((lon[ix], lat[ix])).tolist()},
+                    "properties": {"style": {"color": colors[ix[-1]], "weight": 2, "opacity": 0.7}},
+                }
+                for ix in fixes.groupby("vessel_uid", sort=False, observed=True).indices.values()
+                if len(ix) >= 2
+            ]
+            if tracks:
+                folium.GeoJson(
+                    data={"type": "FeatureCollection", "features": tracks},
+                    style_function=lambda f: f["properties"]["style"],
+                ).add_to(fg_tracks)
+
+            points_layer(fixes, colors, fix_opacity(fixes), 900, fg_points)
 
             fg_tracks.add_to(m)
             fg_points.add_to(m)
@@ -668,34 +1074,40 @@ def tab_health():
     ORDER BY hypertable;
     """
 
-    c1, c2 = st.columns(2)
-    with c1:
-        st.subheader("Table sizes (GB)")
-        try:
-            sizes = fetch_df(SQL_TABLE_SIZES)
-            sizes["size_gb"] = sizes["size_gb"].astype(float).round(3)
-            st.dataframe(sizes, width='stretch', height=360)
-        except Exception as e:
-            st.error(f"Could not fetch table sizes.\n\n{e}")
+    try:
+        conn = tab_conn()
+    except Exception as e:
+        st.error(f"Could not connect to the database.\n\n{e}")
+        return
+    with conn:
+        c1, c2 = st.columns(2)
+        with c1:
+            st.subheader("Table sizes (GB)")
+            try:
+                sizes = fetch_df(SQL_TABLE_SIZES, conn=conn)
+                sizes["size_gb"] = sizes["size_gb"].astype(float).round(3)
+                st.dataframe(sizes, width='stretch', height=360)
+            except Exception as e:
+                st.error(f"Could not fetch table sizes.\n\n{e}")
+
+        with c2:
+            st.subheader("Estimated row counts")
+            try:
+                rows = fetch_df(SQL_ROW_COUNTS, conn=conn)
+                st.dataframe(rows, width='stretch', height=360)
+            except Exception as e:
+                st.error(f"Could not fetch row counts.\n\n{e}")
 
-    with c2:
-        st.subheader("Estimated row counts")
+        st.markdown("---")
+        st.subheader("TimescaleDB hypertables")
         try:
-            rows = fetch_df(SQL_ROW_COUNTS)
-            st.dataframe(rows, width='stretch', height=360)
-        except Exception as e:
-            st.error(f"Could not fetch row counts.\n\n{e}")
-
-    st.markdown("---")
-    st.subheader("TimescaleDB hypertables")
-    try:
-        feats = fetch_df(SQL_TSDB_FEATURES)
-        if feats.empty:
-            st.info("No hypertables detected (or Timescale not enabled).")
-        else:
-            st.dataframe(feats, width='stretch', height=240)
-    except Exception:
-        st.info("timescaledb_information not available.")
+            feats = fetch_df(SQL_TSDB_FEATURES, conn=conn)
+            if feats.empty:
+                st.info("No hypertables detected (or Timescale not enabled).")
+            else:
+                st.dataframe(feats, width='stretch', height=240)
+        except Exception:
+            st.info("timescaledb_information not available.")
 
 def tab_explorer():
     st.markdown("## 🔎 Explorer (SQL)")
@@ -720,41 +1132,43 @@ def tab_flows_and_lifts():
     st.markdown("## 📈 Flows & Lifts (CAGGs)")
 
     # Choose port area for lifts (use core areas ideally)
-    ports = fetch_df(SQL_AREA_PORTS)
+    ports = load_ports()
     if ports.empty:
         st.info("No port areas found.")
         return
     p_choice = st.selectbox("Port area (for lifts)", ports["area_id"].tolist(), index=0)
-    start = st.date_input("Start date", value=pd.Timestamp.utcnow().date() - pd.Timedelta(days=30))
-    end   = st.date_input("End date", value=pd.Timestamp.utcnow().date())
+    start = st.date_input("Start date", value=utc_today() - timedelta(days=30))
+    end   = st.date_input("End date", value=utc_today())
+
+    start, end = day_window(start, end)
+    f_ewm = submit(load_daily, SQL_CA_PORT_LIFTS_EWM, "area_id", p_choice, start, end)
+    f_daily = submit(load_daily, SQL_CA_PORT_LIFTS_DAILY, "area_id", p_choice, start, end)
 
     c1, c2 = st.columns(2)
     with c1:
         st.subheader("Port lifts — Daily (CAGG)")
         try:
-            df = fetch_df(SQL_CA_PORT_LIFTS_EWM, {"area_id": p_choice, "start": start, "end": end})
+            df = f_ewm.result()
             if df.empty:
                 st.info("No daily lifts for selected window.")
             else:
-                df["day"] = pd.to_datetime(df["day"], utc=True)
-                st.line_chart(df.set_index("day")[["arrive_dwt_ewm","depart_dwt_ewm"]], height=280)
+                line_chart(df[["arrive_dwt_ewm","depart_dwt_ewm"]], height=280)
         except Exception as e:
             st.error(f"Lifts daily error: {e}")
 
     with c2:
         st.subheader("Port lifts — Daily raw (CAGG)")
         try:
-            df = fetch_df(SQL_CA_PORT_LIFTS_DAILY, {"area_id": p_choice, "start": start, "end": end})
+            df = f_daily.result()
             if df.empty:
                 st.info("No daily lifts for selected window.")
             else:
-                df["day"] = pd.to_datetime(df["day"], utc=True)
-                st.line_chart(df.set_index("day")[["arrive_dwt","depart_dwt"]], height=280)
+                line_chart(df[["arrive_dwt","depart_dwt"]], height=280)
         except Exception as e:
             st.error(f"Lifts daily error: {e}")
 
     st.markdown("---")
-    lanes = fetch_df(SQL_LANES)
+    lanes = load_lanes()
     if lanes.empty:
         st.info("No lanes/chokepoints found.")
         return
@@ -762,12 +1176,11 @@ def tab_flows_and_lifts():
 
     st.subheader("Lane flows — Daily (CAGG)")
     try:
-        df = fetch_df(SQL_CA_LANE_EWM, {"lane_id": l_choice, "start": start, "end": end})
+        df = load_daily(SQL_CA_LANE_EWM, "lane_id", l_choice, start, end)
         if df.empty:
             st.info("No lane data for selected window.")
         else:
-            df["day"] = pd.to_datetime(df["day"], utc=True)
-            st.line_chart(df.set_index("day")[["transit_cnt_ewm","laden_dwt_sum_ewm"]], height=280)
+            line_chart(df[["transit_cnt_ewm","laden_dwt_sum_ewm"]], height=280)
     except Exception as e:
         st.error(f"Lane flow error: {e}")
 
@@ -775,79 +1188,78 @@ def tab_queues_and_transit():
     st.markdown("## ⛴️ Queues & Transit Times")
 
     # Anchorage queues (approach areas)
-    approaches = fetch_df("""
-        SELECT area_id, name FROM public.area
-        WHERE kind='port' AND subtype='approach'
-        ORDER BY name, area_id;
-    """)
+    approaches = load_approaches()
     if approaches.empty:
         st.info("No approach areas found.")
         return
     a_choice = st.selectbox("Approach area (queues)", approaches["area_id"].tolist(), index=0)
-    start = st.date_input("Start date", value=pd.Timestamp.utcnow().date() - pd.Timedelta(days=30), key="qs_start")
-    end   = st.date_input("End date", value=pd.Timestamp.utcnow().date(), key="qs_end")
+    start = st.date_input("Start date", value=utc_today() - timedelta(days=30), key="qs_start")
+    end   = st.date_input("End date", value=utc_today(), key="qs_end")
+
+    start, end = day_window(start, end)
+    f_anchor_ewm = submit(load_daily, SQL_CA_ANCHOR_EWM, "area_id", a_choice, start, end)
+    f_anchor_mv = submit(load_daily, SQL_MV_ANCHOR, "area_id", a_choice, start, end)
 
     c1, c2 = st.columns(2)
     with c1:
         st.subheader("Anchorage queue — Daily MV")
         try:
-            df = fetch_df(SQL_CA_ANCHOR_EWM, {"area_id": a_choice, "start": start, "end": end})
+            df = f_anchor_ewm.result()
             if df.empty:
                 st.info("No occupancy MV in window.")
             else:
-                df["day"] = pd.to_datetime(df["day"], utc=True)
-                st.line_chart(df.set_index("day")[["queue_cnt_ewm"]], height=280)
+                line_chart(df[["queue_cnt_ewm"]], height=280)
         except Exception as e:
             st.error(f"Occupancy MV error: {e}")
 
     with c2:
         st.subheader("Anchorage occupancy — Daily MV")
         try:
-            df = fetch_df(SQL_MV_ANCHOR, {"area_id": a_choice, "start": start, "end": end})
+            df = f_anchor_mv.result()
             if df.empty:
                 st.info("No occupancy MV in window.")
             else:
-                df["day"] = pd.to_datetime(df["day"], utc=True)
-                st.line_chart(df.set_index("day")[["avg_cnt","p50_cnt"]], height=280)
+                line_chart(df[["avg_cnt","p50_cnt"]], height=280)
         except Exception as e:
             st.error(f"Occupancy MV error: {e}")
 
     st.markdown("---")
-    lanes = fetch_df(SQL_LANES)
+    lanes = load_lanes()
     if lanes.empty:
         st.info("No lanes/chokepoints found.")
         return
     l_choice = st.selectbox("Lane / chokepoint (transit time)", lanes["lane_id"].tolist(), index=0)
 
+    f_tt_ewm = submit(load_daily, SQL_CA_TT_EWM, "lane_id", l_choice, start, end)
+    f_tt_mv = submit(load_daily, SQL_MV_LANE_TT, "lane_id", l_choice, start, end)
+
     c3, c4 = st.columns(2)
     with c3:
         st.subheader("Transit time — Daily MV (p50)")
         try:
-            df = fetch_df(SQL_CA_TT_EWM, {"lane_id": l_choice, "start": start, "end": end})
+            df = f_tt_ewm.result()
             if df.empty:
                 st.info("No transit MV in window.")
             else:
-                df["day"] = pd.to_datetime(df["day"], utc=True)
-                st.line_chart(df.set_index("day")[["transit_time_p50_ewm"]], height=280)
+                line_chart(df[["transit_time_p50_ewm"]], height=280)
         except Exception as e:
             st.error(f"Transit MV error: {e}")
 
     with c4:
         st.subheader("Transit time — Daily MV (p50/p90/mean)")
         try:
-            df = fetch_df(SQL_MV_LANE_TT, {"lane_id": l_choice, "start": start, "end": end})
+            df = f_tt_mv.result()
             if df.empty:
                 st.info("No transit MV in window.")
             else:
-                df["day"] = pd.to_datetime(df["day"], utc=True)
-                st.line_chart(df.set_index("day")[["p50_hours","p90_hours","mean_hours"]], height=280)
+                line_chart(df[["p50_hours","p90_hours","mean_hours"]], height=280)
         except Exception as e:
             st.error(f"Transit MV error: {e}")
 
 def tab_routing_and_mix():
     st.markdown("## 🔀 Routing & Class Mix")
 
-    lanes = fetch_df(SQL_LANES)
+    lanes = load_lanes()
     if lanes.empty:
         st.info("No lanes available.")
         return
@@ -857,77 +1269,93 @@ def tab_routing_and_mix():
     left_lane  = st.selectbox("Lane A (e.g., Cape)", lane_ids, index=0)
     right_lane = st.selectbox("Lane B (e.g., Mid-Atlantic)", lane_ids, index=min(1, len(lane_ids)-1))
 
-    start = st.date_input("Start date", value=pd.Timestamp.utcnow().date() - pd.Timedelta(days=60), key="rm_start")
-    end   = st.date_input("End date", value=pd.Timestamp.utcnow().date(), key="rm_end")
-
-    # Fetch both (daily CAGG with aliases)
-    def lane_flow(lid):
-        df = fetch_df(SQL_CA_LANE_EWM, {"lane_id": lid, "start": start, "end": end})
-        if not df.empty:
-            df["day"] = pd.to_datetime(df["day"], utc=True)
-            df = df.set_index("day")[["laden_dwt_sum_ewm"]].rename(columns={"laden_dwt_sum_ewm": lid})
-        return df
+    start = st.date_input("Start date", value=utc_today() - timedelta(days=60), key="rm_start")
+    end   = st.date_input("End date", value=utc_today(), key="rm_end")
+    start, end = day_window(start, end)
 
-    a = lane_flow(left_lane)
-    b = lane_flow(right_lane)
+    # A full rerun (lanes/dates) fetches all three sections in one query; the mix and
+    # ballast lanes are read from their widgets' last state. Picking a lane inside one
+    # of the fragments below reruns only that fragment.
+    mix_lane = st.session_state.get("lane_mix", lane_ids[0])
+    bal_lane = st.session_state.get("lane_ballast", lane_ids[0])
+    bundle = load_routing_bundle((left_lane, right_lane), mix_lane, bal_lane, start, end)
 
-    if a is None or a.empty or b is None or b.empty:
+    merged = bundle["flow"]
+    if merged.empty or not {left_lane, right_lane} <= set(merged.columns):
         st.info("Insufficient lane data for routing share.")
     else:
-        merged = a.join(b, how="outer").sort_index()
-        merged["routing_share_A"] = merged[left_lane] / (merged[left_lane] + merged[right_lane])
+        # One pass on the raw values: no index alignment for the sum and the divide
+        arr = merged[[left_lane, right_lane]].to_numpy(dtype=np.float64, na_value=np.nan)
+        total = arr.sum(axis=1)
+        merged["routing_share_A"] = np.divide(arr[:, 0], total, out=np.full(len(arr), np.nan), where=total != 0)
         st.subheader("Routing share (A / (A + B))")
-        st.line_chart(merged[["routing_share_A"]], height=280)
+        line_chart(merged[["routing_share_A"]], height=280)
 
     st.markdown("---")
+    class_mix_block(lane_ids, start, end, (mix_lane, bundle["mix"]))
+
+    st.markdown("---")
+    ballast_block(lane_ids, start, end, (bal_lane, bundle["bal"]))
+
+def lane_daily(prefetched, sql, lane_id, start, end) -> pd.DataFrame:
+    """The full rerun's (lane, frame) from the routing bundle when the lane still
+    matches, else a (cached) fetch for the lane just picked."""
+    lane0, df = prefetched
+    return df if lane_id == lane0 else load_daily(sql, "lane_id", lane_id, start, end)
+
+@st.fragment
+def class_mix_block(lane_ids, start, end, prefetched):
     # Class mix on a selected lane (daily shares via CAGG)
     lane_mix = st.selectbox("Lane for class mix", lane_ids, index=0, key="lane_mix")
     try:
-        mix = fetch_df(SQL_CA_CLASS_MIX, {"lane_id": lane_mix, "start": start, "end": end})
+        mix = lane_daily(prefetched, SQL_CA_CLASS_MIX, lane_mix, start, end)
         if mix.empty:
             st.info("No class mix data.")
         else:
-            mix["day"] = pd.to_datetime(mix["day"], utc=True)
             st.subheader("Class mix — Daily shares (CAGG)")
-            st.line_chart(mix.set_index("day")[["vlcc_share_ewm","suezmax_share_ewm","aframax_share_ewm"]], height=280)
+            line_chart(mix[["vlcc_share_ewm","suezmax_share_ewm","aframax_share_ewm"]], height=280)
     except Exception as e:
         st.error(f"Class mix error: {e}")
 
-    st.markdown("---")
+@st.fragment
+def ballast_block(lane_ids, start, end, prefetched):
     # Ballast returns (lead signal) — daily CAGG
     lane_ballast = st.selectbox("Lane for ballast return", lane_ids, index=0, key="lane_ballast")
     try:
-        bal = fetch_df(SQL_CA_BALLAST_EWM, {"lane_id": lane_ballast, "start": start, "end": end})
+        bal = lane_daily(prefetched, SQL_CA_BALLAST_EWM, lane_ballast, start, end)
         if bal.empty:
             st.info("No ballast data.")
         else:
-            bal["day"] = pd.to_datetime(bal["day"], utc=True)
             st.subheader("Ballast return — Daily (CAGG)")
-            st.line_chart(bal.set_index("day")[["ballast_dwt_ewm"]], height=280)
+            line_chart(bal[["ballast_dwt_ewm"]], height=280)
     except Exception as e:
         st.error(f"Ballast error: {e}")
 
 def tab_features():
     st.markdown("## 🧪 Final ML Features")
 
-    start = st.date_input("Start date", value=pd.Timestamp.utcnow().date() - pd.Timedelta(days=90), key="fx_start")
-    end   = st.date_input("End date", value=pd.Timestamp.utcnow().date(), key="fx_end")
+    start = st.date_input("Start date", value=utc_today() - timedelta(days=90), key="fx_start")
+    end   = st.date_input("End date", value=utc_today(), key="fx_end")
+    start, end = day_window(start, end)
 
     try:
-        df = fetch_df(SQL_ML_FEATURES, {"start": start, "end": end})
-        if df.empty:
+        feature_cols = load_ml_feature_columns()
+        preview = load_ml_features_tail(start, end) if feature_cols else pd.DataFrame()
+        if preview.empty:
             st.info("No ml_features_daily rows yet. Build/populate the view first.")
             return
-        df["day"] = pd.to_datetime(df["day"], utc=True)
-        st.dataframe(df.tail(200), width='stretch', height=360)
-
-        # Quick pick of a few columns if present
-        pick_cols = [c for c in df.columns if c not in ("day",)]
-        if pick_cols:
-            st.subheader("Quick chart")
-            sel = st.multiselect("Columns to plot", pick_cols[:10], default=pick_cols[:3])
-            if sel:
-                st.line_chart(df.set_index("day")[sel], height=280)
+        preview["day"] = to_utc(preview["day"])
+        # Hand Streamlit an Arrow table: it serializes that as-is instead of
+        # running its own pandas -> Arrow conversion on the wide frame
+        import pyarrow as pa
+        st.dataframe(pa.Table.from_pandas(shrink(preview), preserve_index=False), width='stretch', height=360)
+
+        # Quick pick of a few columns; only the picked ones are fetched for the window
+        st.subheader("Quick chart")
+        sel = st.multiselect("Columns to plot", feature_cols[:10], default=feature_cols[:3])
+        if sel:
+            df = load_ml_features(start, end, tuple(sel))
+            line_chart(df[sel], height=280)
     except Exception as e:
         st.error(f"Load features failed: {e}")
 
@@ -936,22 +1364,23 @@ def tab_features():
 # -----------------------------
 st.title("🌊 AIS Dashboard 🌊")
 
-tabs = st.tabs([
-    "Overview", "Ports & Occupancy", "Map",
-    "Flows & Lifts", "Queues & Transit", "Routing & Mix",
-    "Features", "Database Health", "Explorer"
-])
+# st.tabs runs every tab body on each rerun (all nine tabs' queries); a tab-style
+# radio + dispatch runs only the visible one
+TABS = {
+    "Overview":          lambda: tab_overview(hours),
+    "Ports & Occupancy": tab_ports,
+    "Map":               lambda: tab_map(map_age),
+    "Flows & Lifts":     tab_flows_and_lifts,
+    "Queues & Transit":  tab_queues_and_transit,
+    "Routing & Mix":     tab_routing_and_mix,
+    "Features":          tab_features,
+    "Database Health":   tab_health,
+    "Explorer":          tab_explorer,
+}
+active_tab = st.radio("View", list(TABS), horizontal=True, key="active_tab", label_visibility="collapsed")
 hours, map_age = header_kpis("overview")
 
-with tabs[0]: tab_overview(hours)
-with tabs[1]: tab_ports()
-with tabs[2]: tab_map(map_age)
-with tabs[3]: tab_flows_and_lifts()
-with tabs[4]: tab_queues_and_transit()
-with tabs[5]: tab_routing_and_mix()
-with tabs[6]: tab_features()
-with tabs[7]: tab_health()
-with tabs[8]: tab_explorer()
+TABS[active_tab]()
 
 st.sidebar.markdown("---")
 st.sidebar.write(f"DB: `{PG_DSN}`")
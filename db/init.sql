@@ -11,6 +11,7 @@ CREATE EXTENSION IF NOT EXISTS postgis;       -- geometry types & spatial ops
 DROP TABLE IF EXISTS public.vessel_dwell_session CASCADE;  -- has trigger on ais_event
 DROP TABLE IF EXISTS public.vessel_cargo_state  CASCADE;   -- referenced by event emitter
 DROP TABLE IF EXISTS public.vessel_state        CASCADE;   -- referenced by event emitter
+DROP TABLE IF EXISTS public.latest_fix          CASCADE;   -- referenced by event emitter
 DROP TABLE IF EXISTS public.ais_event           CASCADE;   -- written by event emitter
 DROP TABLE IF EXISTS public.ais_fix             CASCADE;   -- has BEFORE/AFTER triggers
 DROP TABLE IF EXISTS public.area_gate           CASCADE;   -- depends on area
@@ -54,6 +55,49 @@ CREATE TABLE public.area_gate (
 CREATE INDEX IF NOT EXISTS idx_area_gate_geom    ON public.area_gate USING gist (geom);
 CREATE INDEX IF NOT EXISTS idx_area_gate_parent  ON public.area_gate (area_id, subtype);
 
+-- Precomputed (unbuffered) bboxes for collector/build-tiles.py.
+-- The degree buffer is applied arithmetically at query time, so no PostGIS work per run.
+-- Refresh after (re)seeding areas/gates (done at the end of seed-areas-from-geojson.sql).
+DROP MATERIALIZED VIEW IF EXISTS public.mv_area_bbox;
+CREATE MATERIALIZED VIEW public.mv_area_bbox AS
+SELECT area_id, kind, subtype,
+       ST_XMin(geom) AS minlon, ST_YMin(geom) AS minlat,
+       ST_XMax(geom) AS maxlon, ST_YMax(geom) AS maxlat
+FROM public.area;
+
+CREATE UNIQUE INDEX IF NOT EXISTS uq_mv_area_bbox ON public.mv_area_bbox (area_id);
+
+DROP MATERIALIZED VIEW IF EXISTS public.mv_area_gate_bbox;
+CREATE MATERIALIZED VIEW public.mv_area_gate_bbox AS
+SELECT gate_id, area_id, kind, subtype,
+       ST_XMin(geom) AS minlon, ST_YMin(geom) AS minlat,
+       ST_XMax(geom) AS maxlon, ST_YMax(geom) AS maxlat
+FROM public.area_gate;
+
+CREATE UNIQUE INDEX IF NOT EXISTS uq_mv_area_gate_bbox ON public.mv_area_gate_bbox (gate_id);
+
+-- Pre-simplified GeoJSON for the dashboard map at a fixed tolerance ladder (degrees),
+-- so it reads a string instead of running ST_SimplifyPreserveTopology per request.
+-- Keep the ladder in sync with GEOJSON_TOLS in dashboard/app.py.
+-- Refresh after (re)seeding areas/gates (done at the end of seed-areas-from-geojson.sql).
+DROP MATERIALIZED VIEW IF EXISTS public.mv_area_geojson;
+CREATE MATERIALIZED VIEW public.mv_area_geojson AS
+SELECT a.area_id, t.tol, a.name, a.kind, a.subtype, a."group",
+       ST_AsGeoJSON(ST_SimplifyPreserveTopology(a.geom, t.tol::float8)) AS geojson
+FROM public.area a
+CROSS JOIN unnest(ARRAY[0.002, 0.005, 0.01, 0.02]::numeric[]) AS t(tol);
+
+CREATE UNIQUE INDEX IF NOT EXISTS uq_mv_area_geojson ON public.mv_area_geojson (tol, area_id);
+
+DROP MATERIALIZED VIEW IF EXISTS public.mv_area_gate_geojson;
+CREATE MATERIALIZED VIEW public.mv_area_gate_geojson AS
+SELECT g.gate_id, t.tol, g.area_id, g.name, g.kind, g.subtype, g."group",
+       ST_AsGeoJSON(ST_SimplifyPreserveTopology(g.geom, t.tol::float8)) AS geojson
+FROM public.area_gate g
+CROSS JOIN unnest(ARRAY[0.002, 0.005, 0.01, 0.02]::numeric[]) AS t(tol);
+
+CREATE UNIQUE INDEX IF NOT EXISTS uq_mv_area_gate_geojson ON public.mv_area_gate_geojson (tol, gate_id);
+
 -- ============================================================================
 -- AIS time-series (TimescaleDB)
 -- ============================================================================
@@ -428,6 +472,14 @@ CREATE TABLE IF NOT EXISTS public.vessel_cargo_state (
   updated_ts  timestamptz
 );
 
+-- Newest fix per vessel (same columns as ais_fix), kept by the event emitter so
+-- the dashboard map reads ~one row per vessel instead of probing the hypertable
+CREATE TABLE IF NOT EXISTS public.latest_fix (
+  LIKE public.ais_fix INCLUDING DEFAULTS INCLUDING CONSTRAINTS,
+  PRIMARY KEY (vessel_uid)
+);
+CREATE INDEX IF NOT EXISTS idx_latest_fix_ts ON public.latest_fix (ts DESC);  -- lookback filter
+
 CREATE OR REPLACE FUNCTION public.f_emit_events() RETURNS trigger AS $$
 DECLARE
   s public.vessel_state;
@@ -595,6 +647,40 @@ BEGIN
       gate_end         = EXCLUDED.gate_end,
       updated_ts       = EXCLUDED.updated_ts;
 
+  -- =========================
+  -- Newest fix per vessel (older/out-of-order fixes leave it alone)
+  -- =========================
+  INSERT INTO public.latest_fix
+  SELECT NEW.*
+  ON CONFLICT (vessel_uid) DO UPDATE
+  SET ts               = EXCLUDED.ts,
+      src              = EXCLUDED.src,
+      lat              = EXCLUDED.lat,
+      lon              = EXCLUDED.lon,
+      sog              = EXCLUDED.sog,
+      cog              = EXCLUDED.cog,
+      heading          = EXCLUDED.heading,
+      elapsed          = EXCLUDED.elapsed,
+      destination      = EXCLUDED.destination,
+      flag             = EXCLUDED.flag,
+      length_m         = EXCLUDED.length_m,
+      width_m          = EXCLUDED.width_m,
+      dwt              = EXCLUDED.dwt,
+      shipname         = EXCLUDED.shipname,
+      shiptype         = EXCLUDED.shiptype,
+      ship_id          = EXCLUDED.ship_id,
+      rot              = EXCLUDED.rot,
+      geom             = EXCLUDED.geom,
+      area_id_core     = EXCLUDED.area_id_core,
+      in_core          = EXCLUDED.in_core,
+      area_id_approach = EXCLUDED.area_id_approach,
+      in_approach      = EXCLUDED.in_approach,
+      lane_id          = EXCLUDED.lane_id,
+      in_lane          = EXCLUDED.in_lane,
+      gate_id          = EXCLUDED.gate_id,
+      gate_end         = EXCLUDED.gate_end
+  WHERE EXCLUDED.ts > public.latest_fix.ts;
+
   RETURN NEW;
 END;
 $$ LANGUAGE plpgsql;
@@ -97,6 +97,14 @@ SET area_id = EXCLUDED.area_id,
     notes   = EXCLUDED.notes,
     geom    = EXCLUDED.geom;
 
+-- 7) Refresh precomputed bboxes used by collector/build-tiles.py
+REFRESH MATERIALIZED VIEW public.mv_area_bbox;
+REFRESH MATERIALIZED VIEW public.mv_area_gate_bbox;
+
+-- 8) Refresh pre-simplified GeoJSON used by dashboard/app.py's map
+REFRESH MATERIALIZED VIEW public.mv_area_geojson;
+REFRESH MATERIALIZED VIEW public.mv_area_gate_geojson;
+
 COMMIT;
 
 -- Summary (optional)
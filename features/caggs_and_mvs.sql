@@ -76,7 +76,9 @@ SELECT add_continuous_aggregate_policy(
 
 -- ---------------------------------------------------------------------------
 -- 3) LANE TRANSIT TIMES (daily, MV) — from vessel_dwell_session (regular table)
---     (Not a CAGG because source is not a hypertable.)
+--     (Not a CAGG: the source is not a hypertable — sessions are keyed on
+--     start_ts but bucketed on end_ts, which is NULL until close and then
+--     UPDATEd — and percentile_disc (ordered-set) isn't allowed in a CAGG.)
 -- ---------------------------------------------------------------------------
 DROP MATERIALIZED VIEW IF EXISTS public.mv_lane_transit_time_daily;
 CREATE MATERIALIZED VIEW public.mv_lane_transit_time_daily AS
@@ -98,7 +100,9 @@ CREATE INDEX IF NOT EXISTS ix_mv_lane_transit_time_daily_day_lane
 
 -- ---------------------------------------------------------------------------
 -- 4) ANCHORAGE QUEUES (daily, MV) — approach occupancy proxy
---     (We aggregate 5-min snapshots derived from sessions; MV not CAGG.)
+--     (We aggregate 5-min snapshots derived from sessions; MV not CAGG: same
+--     non-hypertable source, and the aggregate-of-aggregate over a CTE would
+--     need a hierarchical CAGG on a 5-minute CAGG that can't exist here.)
 -- ---------------------------------------------------------------------------
 DROP MATERIALIZED VIEW IF EXISTS public.mv_area_occupancy_daily;
 CREATE MATERIALIZED VIEW public.mv_area_occupancy_daily AS
@@ -180,6 +184,160 @@ SELECT add_continuous_aggregate_policy(
   schedule_interval => INTERVAL '30 minutes'
 );
 
+-- ---------------------------------------------------------------------------
+-- 7) MV REFRESH JOB — refreshes the two dwell-session MVs in a background worker
+--     so the collector's refresh_all only waits on CAGGs.
+--     Skips an MV when vessel_dwell_session saw no writes since its last run
+--     (counters kept in the job config); uses a plain REFRESH when the MV is
+--     unpopulated/empty or the change exceeds 20% of its row estimate, where
+--     CONCURRENTLY's temp-table diff is the slower path. Runs in the nightly
+--     maintenance hour (02:00-03:00 UTC, config key plain_refresh_hour_utc)
+--     always refresh plain: one rewrite, and readers are few then.
+-- ---------------------------------------------------------------------------
+CREATE OR REPLACE PROCEDURE public.job_refresh_dwell_mvs(job_id int, config jsonb)
+LANGUAGE plpgsql AS $$
+DECLARE
+  mv        text;
+  writes    bigint;
+  prev      bigint;
+  populated boolean;
+  est_rows  bigint;
+  cfg       jsonb := COALESCE(config, '{}'::jsonb);
+  nightly   boolean := extract(hour FROM now() AT TIME ZONE 'UTC')
+                       = COALESCE((config->>'plain_refresh_hour_utc')::int, 2);
+BEGIN
+  cfg := jsonb_set(cfg, '{base_writes}', COALESCE(cfg->'base_writes', '{}'::jsonb));
+
+  SELECT s.n_tup_ins + s.n_tup_upd + s.n_tup_del
+    INTO writes
+    FROM pg_stat_all_tables s
+   WHERE s.relid = 'public.vessel_dwell_session'::regclass;
+
+  FOREACH mv IN ARRAY ARRAY['public.mv_lane_transit_time_daily',
+                            'public.mv_area_occupancy_daily'] LOOP
+    prev := (cfg->'base_writes'->>mv)::bigint;
+    CONTINUE WHEN writes IS NOT NULL AND prev = writes;   -- base table untouched
+
+    SELECT c.relispopulated, c.reltuples::bigint
+      INTO populated, est_rows
+      FROM pg_class c
+     WHERE c.oid = mv::regclass;
+
+    IF nightly
+       OR NOT populated
+       OR est_rows <= 0                                   -- empty, or never analyzed (-1)
+       OR (prev IS NOT NULL AND writes - prev > 0.2 * est_rows) THEN
+      EXECUTE format('REFRESH MATERIALIZED VIEW %s', mv);
+    ELSE
+      EXECUTE format('REFRESH MATERIALIZED VIEW CONCURRENTLY %s', mv);
+    END IF;
+
+    cfg := jsonb_set(cfg, ARRAY['base_writes', mv], COALESCE(to_jsonb(writes), 'null'::jsonb));
+  END LOOP;
+
+  PERFORM alter_job(job_id, config => cfg);
+END $$;
+
+SELECT delete_job(job_id)
+FROM timescaledb_information.jobs
+WHERE proc_schema = 'public' AND proc_name = 'job_refresh_dwell_mvs';
+
+SELECT add_job('public.job_refresh_dwell_mvs', INTERVAL '5 minutes');
+
+-- ---------------------------------------------------------------------------
+-- 8) CAGG REFRESH ENTRY POINT — what collector/maintenance.py's refresh_all CALLs
+--     Window (UTC): [start_of_day(now - N days), start_of_tomorrow). Only CAGGs
+--     with invalidations in the window are refreshed, each from the first dirty
+--     day. Must be CALLed outside a transaction block (autocommit): each
+--     refresh_continuous_aggregate commits on its own.
+--     Session advisory lock 0x41495352 ('AISR') keeps one run at a time; it is
+--     released at the end, or by the session closing if a refresh errors.
+--     The caller's statement_timeout covers the whole CALL (every refresh in the
+--     loop), not each refresh; size it for all of them.
+-- ---------------------------------------------------------------------------
+CREATE OR REPLACE PROCEDURE public.maintenance_refresh_all(backfill_days int DEFAULT 2)
+LANGUAGE plpgsql AS $$
+DECLARE
+  caggs  text[] := ARRAY['public.ca_port_lifts_daily',
+                         'public.ca_lane_transit_daily',
+                         'public.ca_ballast_return_daily',
+                         'public.ca_class_mix_daily'];
+  d1     timestamptz := date_trunc('day', now(), 'UTC') + interval '1 day';
+  d0     timestamptz := d1 - make_interval(days => backfill_days + 1);
+  -- TimescaleDB stores invalidation ranges as int8 microseconds since 2000-01-01 UTC
+  i0     bigint := ((extract(epoch FROM d0) - 946684800) * 1000000)::bigint;
+  i1     bigint := ((extract(epoch FROM d1) - 946684800) * 1000000)::bigint;
+  names  text[];
+  starts timestamptz[];
+BEGIN
+  IF NOT pg_try_advisory_lock(1095324498) THEN
+    RETURN;   -- another run (other collector / cron tick) is still going
+  END IF;
+
+  -- Dirty if: raw-hypertable invalidations not yet moved, per-CAGG invalidations,
+  -- or the invalidation threshold below d1 (rows above it aren't logged).
+  -- Collected into arrays first: the refreshes below commit, which a live
+  -- query loop must not straddle.
+  BEGIN
+    SELECT array_agg(v.name ORDER BY v.ord),
+           array_agg(GREATEST(date_trunc('day', timestamptz '2000-01-01 UTC'
+                                              + make_interval(secs => lo.dirty_lo / 1000000.0), 'UTC'),
+                              d0) ORDER BY v.ord)
+      INTO names, starts
+      FROM unnest(caggs) WITH ORDINALITY AS v(name, ord)
+      JOIN _timescaledb_catalog.continuous_agg c
+        ON format('%I.%I', c.user_view_schema, c.user_view_name)::regclass = v.name::regclass
+      CROSS JOIN LATERAL (
+        SELECT LEAST(
+          (SELECT min(GREATEST(i.lowest_modified_value, i0))
+             FROM _timescaledb_catalog.continuous_aggs_hypertable_invalidation_log i
+            WHERE i.hypertable_id = c.raw_hypertable_id
+              AND i.lowest_modified_value < i1 AND i.greatest_modified_value >= i0),
+          (SELECT min(GREATEST(m.lowest_modified_value, i0))
+             FROM _timescaledb_catalog.continuous_aggs_materialization_invalidation_log m
+            WHERE m.materialization_id = c.mat_hypertable_id
+              AND m.lowest_modified_value < i1 AND m.greatest_modified_value >= i0),
+          (SELECT GREATEST(COALESCE(min(t.watermark), i0), i0)
+             FROM _timescaledb_catalog.continuous_aggs_invalidation_threshold t
+            WHERE t.hypertable_id = c.raw_hypertable_id
+           HAVING COALESCE(min(t.watermark), i0) < i1)
+        ) AS dirty_lo
+      ) lo
+     WHERE lo.dirty_lo IS NOT NULL;
+  EXCEPTION WHEN OTHERS THEN
+    -- catalog layout differs (TimescaleDB version): refresh all, full window
+    names  := caggs;
+    starts := array_fill(d0, ARRAY[cardinality(caggs)]);
+  END;
+
+  FOR k IN 1 .. COALESCE(cardinality(names), 0) LOOP
+    CALL refresh_continuous_aggregate(names[k]::regclass, starts[k], d1);
+  END LOOP;
+
+  PERFORM pg_advisory_unlock(1095324498);
+END $$;
+
+-- ---------------------------------------------------------------------------
+-- 9) INGEST RATE (15-min, CAGG) — fixes per bucket for the dashboard overview
+--     Real-time (materialized_only = false) so the newest, not yet materialized
+--     buckets are still counted from raw ais_fix at query time.
+-- ---------------------------------------------------------------------------
+DROP MATERIALIZED VIEW IF EXISTS public.ca_ingest_rate_15m;
+CREATE MATERIALIZED VIEW public.ca_ingest_rate_15m
+WITH (timescaledb.continuous, timescaledb.materialized_only = false) AS
+SELECT
+  time_bucket('15 minutes', f.ts) AS minute,
+  count(*)                        AS rows_inserted
+FROM public.ais_fix f
+GROUP BY 1;
+
+SELECT add_continuous_aggregate_policy(
+  'public.ca_ingest_rate_15m',
+  start_offset => INTERVAL '3 days',
+  end_offset   => INTERVAL '15 minutes',
+  schedule_interval => INTERVAL '1 minute'
+);
+
 -- ---------------------------------------------------------------------------
 -- Backfill helpers (run once after load)
 --   Refresh CAGGs over a historical window and bring MVs up to date.